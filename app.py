@@ -2,16 +2,45 @@ import io
 import os
 import time
 import json
+import tempfile
+import functools
+import hashlib
 from datetime import datetime
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
 
 from src.data_loader import load_from_upload, load_from_gsheet_url, brief_summary
 from src.chart_suggester import suggest_charts, ChartSpec
-from src.viz import render_chart, THEMES
-from src.insights import generate_insights
-from src.report import build_pdf_report
-from src.pipeline import process_uploaded_file           
+from src.viz import THEMES
+from src.pipeline import process_uploaded_file
+from src.utils import df_fingerprint, shrink_int_dtypes
+
+
+# Rendering, insights and PDF export pull in kaleido/OpenAI/reportlab; import them
+# only when the branch that needs them runs so the first paint stays fast.
+@functools.lru_cache(maxsize=1)
+def _render_chart():
+    from src.viz import render_chart
+    return render_chart
+
+
+@functools.lru_cache(maxsize=1)
+def _generate_insights():
+    from src.insights import generate_insights
+    return generate_insights
+
+
+@functools.lru_cache(maxsize=1)
+def _build_pdf_report():
+    from src.report import build_pdf_report
+    return build_pdf_report
+
+
+@functools.lru_cache(maxsize=1)
+def _kaleido_available():
+    from src.report import kaleido_available
+    return kaleido_available
 
 LANGUAGE_NAMES = {"en": "English", "de": "Deutsch", "zh": "中文"}
 
@@ -172,36 +201,115 @@ TEXT = {
 }
 
 
+# Streamlit reruns the whole script on every widget change; key the heavy
+# pandas work on a sampled DataFrame fingerprint so reruns hit the cache
+# without hashing every row.
+_DF_HASH_FUNCS = {pd.DataFrame: df_fingerprint}
+
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH_FUNCS)
+def _cached_pipeline(df: pd.DataFrame, mode: str) -> dict:
+    return process_uploaded_file(df, mode=mode, debug=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH_FUNCS)
+def _cached_suggest_charts(df: pd.DataFrame) -> list:
+    return suggest_charts(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH_FUNCS)
+def _cached_chart_data(df: pd.DataFrame, spec_jsons: tuple) -> dict:
+    """One groupby per distinct (kind family, group column, metric) across all suggested charts."""
+    from src.viz import aggregate_specs
+    return aggregate_specs(df, [ChartSpec.model_validate_json(raw) for raw in spec_jsons])
+
+
+# cache_resource hands back the same Figure objects: st.cache_data would unpickle
+# (and so re-validate) every figure on every rerun before st.plotly_chart
+# serializes it. Figures are treated as read-only after construction.
+@st.cache_resource(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH_FUNCS)
+def _cached_figures(df: pd.DataFrame, spec_jsons: tuple, theme: str) -> list:
+    """Build all chart figures from the shared pre-aggregated frames."""
+    from src.viz import chart_data_key
+    specs = [ChartSpec.model_validate_json(raw) for raw in spec_jsons]
+    aggregates = _cached_chart_data(df, spec_jsons)
+    render_chart = _render_chart()
+    # Sequential on purpose: plotly express lazily initialises the shared
+    # template objects and raises "Invalid value" when threads race on them.
+    return [
+        render_chart(df, spec, theme=theme, data=aggregates.get(chart_data_key(df, spec)))
+        for spec in specs
+    ]
+
+
+def _preview_arrow(head: pd.DataFrame):
+    """Convert a preview slice to Arrow; st.dataframe renders pa.Table directly."""
+    try:
+        return pa.Table.from_pandas(head, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed-type object columns: let Streamlit apply its own conversion fallbacks
+        return head
+
+
+_FLAT_TEXT = {(lang, key): template for lang, catalog in TEXT.items() for key, template in catalog.items()}
+_EN_TEXT = TEXT["en"]
+
+
+@functools.lru_cache(maxsize=512)
+def _lookup_text(key: str, lang: str) -> str:
+    return _FLAT_TEXT.get((lang, key)) or _EN_TEXT.get(key) or key
+
+
 def translate(key: str, lang: str, **kwargs) -> str:
-    catalog = TEXT.get(lang, TEXT["en"])
-    template = catalog.get(key) or TEXT["en"].get(key) or key
-    return template.format(**kwargs)
+    template = _lookup_text(key, lang)
+    # Most labels take no arguments; skip str.format for them
+    return template.format(**kwargs) if kwargs else template
 
 
 def generate_data_summary(df: pd.DataFrame) -> str:
     rows, cols = df.shape
     parts = [f"{rows} rows, {cols} columns."]
 
-    date_cols = [c for c in df.columns if "date" in c.lower() or "yearmonth" in c.lower()]
-    if date_cols:
-        col = date_cols[0]
-        series = df[col]
-        parsed = pd.to_datetime(series, errors="coerce")
+    lower_cols = df.columns.astype(str).str.lower()
+    date_cols = df.columns[lower_cols.str.contains("date|yearmonth", regex=True)]
+    if len(date_cols):
+        series = df[date_cols[0]]
+        # Already-parsed columns only need a min/max scan
+        if pd.api.types.is_datetime64_any_dtype(series):
+            parsed = series
+        else:
+            parsed = pd.to_datetime(series, errors="coerce", cache=True)
         if parsed.notna().any():
             parts.append(f"Date range: {parsed.min().date()} → {parsed.max().date()}.")
 
-    amount_cols = [c for c in df.columns if "amount" in c.lower() or "revenue" in c.lower() or "cost" in c.lower()]
-    if amount_cols:
+    amount_cols = df.columns[lower_cols.str.contains("amount|revenue|cost", regex=True)]
+    if len(amount_cols):
         samples = []
         for col in amount_cols[:3]:
-            total = pd.to_numeric(df[col], errors="coerce").sum()
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series):
+                total = series.sum()
+            else:
+                total = pd.to_numeric(series, errors="coerce").sum()
             samples.append(f"{col}: {total:,.2f}")
         parts.append("Key totals: " + "; ".join(samples))
 
     return " ".join(parts)
 
 
-def apply_brand_palette(selected_theme: str):
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH_FUNCS)
+def _all_summaries(df: pd.DataFrame, cleaned: pd.DataFrame) -> dict:
+    """Previews and text summaries behind a single cache lookup per upload."""
+    return {
+        "preview": _preview_arrow(df.head(50)),
+        "cleaned_head": _preview_arrow(cleaned.head(200)),
+        "data_summary": generate_data_summary(df),
+        "brief": brief_summary(df),
+    }
+
+
+@functools.lru_cache(maxsize=4)
+def _palette_html(selected_theme: str) -> str:
     primary = "#0f9d58"  # money green
     if selected_theme == "Dark":
         background = "#0f1115"   # softer midnight
@@ -211,8 +319,7 @@ def apply_brand_palette(selected_theme: str):
         background = "#ffffff"    # clean white canvas
         secondary = "#e6f4ec"     # light money green wash
         text = "#0c1c15"
-    st.markdown(
-        f"""
+    return f"""
         <style>
         :root {{
             --primary-color: {primary};
@@ -247,35 +354,38 @@ def apply_brand_palette(selected_theme: str):
         .st-bb {{ background-color: var(--background-color) !important; }}
         .st-cx {{ color: var(--text-color) !important; }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """
+
+
+def apply_brand_palette(selected_theme: str):
+    st.markdown(_palette_html(selected_theme), unsafe_allow_html=True)
+
+
+def discard_pdf():
+    """Forget the last generated report and delete its temp file."""
+    path = st.session_state.pop("pdf_path", None)
+    if path and os.path.exists(path):
+        os.remove(path)
 
 
 def format_eur(value: float) -> str:
     return f"€{value:,.2f}"
 
 
+# Two rows of three cards, as (text key, cards key)
+_KPI_ROWS = (
+    (("kpi_revenue", "revenue"), ("kpi_cost", "cost"), ("kpi_payroll", "payroll")),
+    (("kpi_profit", "profit"), ("kpi_vat_base", "vat_base"), ("kpi_vat_amount", "vat_amount")),
+)
+
+
 def render_kpi_cards(cards: dict, translate_fn):
     """
     Render bookkeeping KPIs as small metric cards.
     """
-    labels = [
-        (translate_fn("kpi_revenue"), "revenue"),
-        (translate_fn("kpi_cost"), "cost"),
-        (translate_fn("kpi_payroll"), "payroll"),
-        (translate_fn("kpi_profit"), "profit"),
-        (translate_fn("kpi_vat_base"), "vat_base"),
-        (translate_fn("kpi_vat_amount"), "vat_amount"),
-    ]
-
-    # Keep two rows of three cards for compact layout
-    for chunk_start in range(0, len(labels), 3):
-        chunk = labels[chunk_start : chunk_start + 3]
-        cols = st.columns(len(chunk))
-        for col, (label, key) in zip(cols, chunk):
-            with col:
-                st.metric(label=label, value=format_eur(cards.get(key, 0.0)))
+    for row in _KPI_ROWS:
+        for col, (label_key, key) in zip(st.columns(3), row):
+            col.metric(label=translate_fn(label_key), value=format_eur(cards.get(key, 0.0)))
 
 st.set_page_config(
     page_title="Auto Data Visualization Agent | Buchhaltungs-Automatisierung | 财务自动化",
@@ -299,6 +409,99 @@ def t(key: str, **kwargs) -> str:
     return translate(key, ui_language, **kwargs)
 
 
+def chart_card(spec: ChartSpec, fig) -> None:
+    with st.container(border=True):
+        colL, colR = st.columns([3,2])
+        with colL:
+            st.plotly_chart(fig, use_container_width=True)
+        with colR:
+            st.write(f"**{t('chart_type')}**: {spec.kind}")
+            desc_parts = []
+            if spec.kind == "line":
+                desc_parts.append(f"Line chart: track {spec.y or 'y'} over {spec.x or 'x'} (agg={spec.agg}).")
+            elif spec.kind == "bar":
+                desc_parts.append(f"Bar chart: compare {spec.y or 'y'} across {spec.x or 'x'} (agg={spec.agg}).")
+            elif spec.kind == "pie":
+                desc_parts.append(f"Pie chart: share of {spec.y or 'y'} by {spec.category or spec.x}.")
+            if spec.title:
+                desc_parts.append(f"Title: \"{spec.title}\".")
+            st.write(" ".join(desc_parts))
+
+
+def choose_specs(specs: list, spec_jsons: tuple) -> list:
+    """
+    One selection table instead of a checkbox per chart: a single widget state
+    entry regardless of how many charts were suggested.
+    """
+    table = pd.DataFrame(
+        {
+            "include": [True] * len(specs),
+            "kind": [spec.kind for spec in specs],
+            "x": [spec.x or spec.category for spec in specs],
+            "y": [spec.y for spec in specs],
+            "title": [spec.title for spec in specs],
+        }
+    )
+    # New suggestions (e.g. another upload) get a fresh widget instead of stale row edits
+    digest = hashlib.md5("".join(spec_jsons).encode("utf-8")).hexdigest()[:12]
+    edited = st.data_editor(
+        table,
+        column_config={"include": st.column_config.CheckboxColumn(t("include_in_report"))},
+        disabled=["kind", "x", "y", "title"],
+        hide_index=True,
+        use_container_width=True,
+        key=f"spec_selection_{digest}",
+    )
+    return [specs[idx] for idx, include in enumerate(edited["include"]) if include]
+
+
+@st.fragment
+def export_section(df_for_viz: pd.DataFrame, chosen: list, chosen_figs: list, insights_text: str, theme: str) -> None:
+    """
+    Report title/brand edits and PDF builds rerun only this section, not the pipeline.
+    `chosen_figs` are the cached figures of `chosen`, so the PDF does not rebuild them.
+    """
+    st.subheader(t("export"))
+    report_title = st.text_input(t("report_title"), value=f"{t('app_title')} — {datetime.now().strftime('%Y-%m-%d')}")
+    brand = st.text_input(t("brand_author"), value=t("app_title"))
+    kaleido_ok = _kaleido_available()()
+    if not kaleido_ok:
+        st.warning(t("kaleido_warning"))
+
+    if st.button(t("build_pdf_btn"), disabled=not (kaleido_ok and chosen), key="build_pdf"):
+        discard_pdf()
+        with st.spinner(t("building_pdf")):
+            try:
+                # Keep multi-MB PDFs out of session state and memory: reportlab writes
+                # straight into the temp file and only its path survives reruns
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+                    st.session_state["pdf_path"] = tmp.name
+                    _build_pdf_report()(
+                        df_for_viz,
+                        chosen,
+                        report_title,
+                        brand,
+                        theme=theme,
+                        insights=insights_text,
+                        output=tmp,
+                        figures=chosen_figs,
+                    )
+            except Exception as e:
+                st.error(t("build_pdf_fail", error=e))
+                discard_pdf()
+
+    pdf_path = st.session_state.get("pdf_path")
+    if pdf_path and os.path.exists(pdf_path):
+        with open(pdf_path, "rb") as pdf_file:
+            st.download_button(
+                t("download_pdf"),
+                data=pdf_file,
+                file_name="auto_viz_report.pdf",
+                mime="application/pdf",
+                key="download_pdf_ready",
+            )
+
+
 theme_options = list(THEMES.keys())
 default_theme = "Default"
 
@@ -353,13 +556,15 @@ elif gsheet_url.strip():
         st.error(t("load_error", error=e))
 
 if df is not None:
+    df = shrink_int_dtypes(df)
     st.success(t("loaded_message", name=src_name, rows=df.shape[0], cols=df.shape[1]))
-    pipeline_result = process_uploaded_file(df, mode=processing_mode, debug=False)
+    pipeline_result = _cached_pipeline(df, processing_mode)
     df_for_viz = pipeline_result["df_final"]
+    summaries = _all_summaries(df, pipeline_result["cleaned"])
     with st.expander(t("data_preview"), expanded=True):
-        st.dataframe(df.head(50), use_container_width=True)
+        st.dataframe(summaries["preview"], use_container_width=True)
     with st.expander(t("cleaned_data"), expanded=True):
-        st.dataframe(pipeline_result["cleaned"].head(200), use_container_width=True)
+        st.dataframe(summaries["cleaned_head"], use_container_width=True)
 
     # Bookkeeping KPI cards (only when bookkeeping path used)
     with st.expander(t("bookkeeping_title"), expanded=True):
@@ -367,47 +572,30 @@ if df is not None:
             st.info(t("bookkeeping_not_applied"))
         else:
             try:
-                cards = pipeline_result["bookkeeping"]["cards"] or {}
-                defaults = {
+                cards = {
                     "revenue": 0.0,
                     "cost": 0.0,
                     "payroll": 0.0,
-                    "profit": cards.get("revenue", 0.0) + cards.get("cost", 0.0),
                     "vat_base": 0.0,
                     "vat_amount": 0.0,
+                    **(pipeline_result["bookkeeping"]["cards"] or {}),
                 }
-                for k, v in defaults.items():
-                    cards.setdefault(k, v)
+                cards.setdefault("profit", cards["revenue"] + cards["cost"])
 
                 render_kpi_cards(cards, t)
             except Exception as e:
                 st.info(t("bookkeeping_unavailable", error=e))
 
     # Chart suggestions
-    specs = suggest_charts(df_for_viz)
+    specs = _cached_suggest_charts(df_for_viz)
     st.subheader(t("suggested_charts"))
-    chosen = []
-    for idx, spec in enumerate(specs):
-        with st.container(border=True):
-            colL, colR = st.columns([3,2])
-            with colL:
-                fig = render_chart(df_for_viz, spec, theme=theme)
-                st.plotly_chart(fig, use_container_width=True)
-            with colR:
-                st.write(f"**{t('chart_type')}**: {spec.kind}")
-                desc_parts = []
-                if spec.kind == "line":
-                    desc_parts.append(f"Line chart: track {spec.y or 'y'} over {spec.x or 'x'} (agg={spec.agg}).")
-                elif spec.kind == "bar":
-                    desc_parts.append(f"Bar chart: compare {spec.y or 'y'} across {spec.x or 'x'} (agg={spec.agg}).")
-                elif spec.kind == "pie":
-                    desc_parts.append(f"Pie chart: share of {spec.y or 'y'} by {spec.category or spec.x}.")
-                if spec.title:
-                    desc_parts.append(f"Title: \"{spec.title}\".")
-                st.write(" ".join(desc_parts))
-                add = st.checkbox(t("include_in_report"), value=True, key=f"include_{idx}_{spec.kind}")
-                if add:
-                    chosen.append(spec)
+    spec_jsons = tuple(spec.model_dump_json() for spec in specs)
+    figs = _cached_figures(df_for_viz, spec_jsons, theme)
+    for spec, fig in zip(specs, figs):
+        chart_card(spec, fig)
+    chosen = choose_specs(specs, spec_jsons)
+    fig_of_spec = {id(spec): fig for spec, fig in zip(specs, figs)}
+    chosen_figs = [fig_of_spec[id(spec)] for spec in chosen]
     if not chosen:
         st.info("Select at least one chart with 'Include in report' to add it to the PDF.")
 
@@ -416,43 +604,18 @@ if df is not None:
     if st.button(t("generate_insights")) or (chosen and st.session_state.get("auto_insights_once") is None and enable_ai):
         st.session_state["auto_insights_once"] = True
         with st.spinner(t("generating_insights")):
-            insights_text = generate_insights(df_for_viz, chosen, language=insight_language if enable_ai else None)
+            insights_text = _generate_insights()(df_for_viz, chosen, language=insight_language if enable_ai else None)
     if insights_text:
         st.subheader(t("insights"))
         st.write(insights_text)
 
     # Summary (moved near export)
     with st.expander(t("summary"), expanded=True):
-        st.write(generate_data_summary(df))
-        st.write(brief_summary(df))
+        st.write(summaries["data_summary"])
+        st.write(summaries["brief"])
 
     # PDF Export
-    st.subheader(t("export"))
-    report_title = st.text_input(t("report_title"), value=f"{t('app_title')} — {datetime.now().strftime('%Y-%m-%d')}")
-    brand = st.text_input(t("brand_author"), value=t("app_title"))
-    from src.report import kaleido_available
-    kaleido_ok = kaleido_available()
-    if not kaleido_ok:
-        st.warning(t("kaleido_warning"))
-
-    if st.button(t("build_pdf_btn"), disabled=not (kaleido_ok and chosen), key="build_pdf"):
-        st.session_state.pop("pdf_bytes", None)
-        with st.spinner(t("building_pdf")):
-            try:
-                pdf_bytes = build_pdf_report(df_for_viz, chosen, report_title, brand, theme=theme, insights=insights_text)
-                st.session_state["pdf_bytes"] = pdf_bytes
-            except Exception as e:
-                st.error(t("build_pdf_fail", error=e))
-                st.session_state.pop("pdf_bytes", None)
-
-    if st.session_state.get("pdf_bytes"):
-        st.download_button(
-            t("download_pdf"),
-            data=st.session_state["pdf_bytes"],
-            file_name="auto_viz_report.pdf",
-            mime="application/pdf",
-            key="download_pdf_ready",
-        )
+    export_section(df_for_viz, chosen, chosen_figs, insights_text, theme)
 
 else:
     st.info(t("upload_prompt"))
@@ -1,10 +1,21 @@
+import functools
 import re
 from pathlib import Path
 from typing import Dict, Iterable, List
 
+import numpy as np
 import pandas as pd
 
-from .data_cleaner import clean_tabular
+from .data_cleaner import _NON_WORD_RE, _UNDERSCORE_RUN_RE, _fill_unparsed, clean_tabular
+from .data_loader import _excel_engine, _read_csv_bytes
+from .utils import month_labels
+
+try:
+    import pyarrow  # noqa: F401
+
+    _TEXT_DTYPE = "string[pyarrow]"
+except ImportError:  # without pyarrow the keyword scans stay on the object path
+    _TEXT_DTYPE = None
 
 # Common column aliases mapped to canonical bookkeeping names
 COLUMN_ALIASES: Dict[str, Iterable[str]] = {
@@ -28,13 +39,32 @@ RULES: List[Dict] = [
 ]
 
 
+# Reverse lookup built once; the first canonical listing an alias keeps it, as in the original scan order
+_ALIAS_TO_CANONICAL: Dict[str, str] = {}
+for _canonical, _aliases in COLUMN_ALIASES.items():
+    for _alias in (_canonical, *_aliases):
+        _ALIAS_TO_CANONICAL.setdefault(_alias, _canonical)
+
+
+# Column labels repeat across every pipeline step; typed so 1, 1.0 and True stay distinct
+@functools.lru_cache(maxsize=4096, typed=True)
 def _normalize_column_key(name: str) -> str:
     base = str(name).replace("\u00A0", " ").strip().lower()
-    base = re.sub(r"[^\w]+", "_", base)
-    base = re.sub(r"_+", "_", base)
+    base = _NON_WORD_RE.sub("_", base)
+    base = _UNDERSCORE_RUN_RE.sub("_", base)
     return base.strip("_")
 
 
+def canonical_rename_map(columns: Iterable[str]) -> Dict[str, str]:
+    """Map each column whose name is a known alias to its canonical bookkeeping name."""
+    rename_map: Dict[str, str] = {}
+    for col in columns:
+        canonical = _ALIAS_TO_CANONICAL.get(_normalize_column_key(col))
+        if canonical is not None:
+            rename_map[col] = canonical
+    return rename_map
+
+
 def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Rename common variants to canonical bookkeeping columns (date, amount, description, currency, iban).
@@ -43,33 +73,30 @@ def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     if df is None:
         raise ValueError("DataFrame is None")
 
-    standardized = df.copy()
-    rename_map: Dict[str, str] = {}
-    for col in standardized.columns:
-        key = _normalize_column_key(col)
-        for canonical, aliases in COLUMN_ALIASES.items():
-            if key == canonical or key in aliases:
-                rename_map[col] = canonical
-                break
+    rename_map = canonical_rename_map(df.columns)
 
-    standardized = standardized.rename(columns=rename_map)
+    # Shares the caller's column data; below, columns are only ever replaced
+    # wholesale, so the input frame is never written to.
+    standardized = df.rename(columns=rename_map, copy=False)
 
     # Normalize date column if present
     if "date" in standardized.columns:
-        standardized["date"] = pd.to_datetime(standardized["date"], errors="coerce")
-        # retry with dayfirst for European-style dates
-        if standardized["date"].notna().mean() < 0.9:
-            standardized["date"] = standardized["date"].fillna(pd.to_datetime(standardized["date"], errors="coerce", dayfirst=True))
+        raw_dates = standardized["date"]
+        parsed = pd.to_datetime(raw_dates, errors="coerce", cache=True)
+        # retry the unparsed raw values with dayfirst for European-style dates
+        if parsed.notna().mean() < 0.9:
+            parsed = _fill_unparsed(parsed, raw_dates, dayfirst=True)
+        standardized["date"] = parsed
 
     # Derive year_month if available
     if "year_month" in standardized.columns:
         ym_raw = standardized["year_month"].astype(str).str.replace("/", "-", regex=False).str.strip()
-        parsed = pd.to_datetime(ym_raw, errors="coerce")
-        parsed = parsed.fillna(pd.to_datetime(ym_raw, errors="coerce", format="%b-%Y", dayfirst=False))
-        parsed = parsed.fillna(pd.to_datetime(ym_raw, errors="coerce", format="%Y-%m"))
-        standardized["year_month"] = parsed.dt.to_period("M").astype(str).where(parsed.notna(), pd.NA)
+        parsed = pd.to_datetime(ym_raw, errors="coerce", cache=True)
+        for fmt in ("%b-%Y", "%Y-%m"):
+            parsed = _fill_unparsed(parsed, ym_raw, format=fmt)
+        standardized["year_month"] = month_labels(parsed).where(parsed.notna(), pd.NA)
     elif "date" in standardized.columns:
-        standardized["year_month"] = standardized["date"].dt.to_period("M").astype(str)
+        standardized["year_month"] = month_labels(standardized["date"])
 
     # Create canonical amount if missing but net/gross columns exist
     if "amount" not in standardized.columns:
@@ -110,13 +137,37 @@ def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return standardized
 
 
-def _keyword_mask(series: pd.Series, keywords: Iterable[str]) -> pd.Series:
+def _keyword_pattern(keywords: Iterable[str]):
+    alternatives = "|".join(re.escape(k.lower()) for k in keywords if k)
+    return re.compile(alternatives) if alternatives else None
+
+
+# Compiled once; categorize_transactions matches them against lowercased text
+_RULE_PATTERNS = [(rule, _keyword_pattern(rule["keywords"])) for rule in RULES]
+_ANY_DESC_PATTERN = _keyword_pattern(k for rule in RULES if rule["name"] != "iban" for k in rule["keywords"])
+_ANY_IBAN_PATTERN = _keyword_pattern(k for rule in RULES if rule["name"] == "iban" for k in rule["keywords"])
+
+
+def _keyword_mask(series: pd.Series, keywords) -> pd.Series:
+    """Rows of a lowercased series containing any keyword; accepts a precompiled pattern."""
     if series.empty:
         return pd.Series(dtype=bool)
-    pattern = "|".join(re.escape(k) for k in keywords if k)
-    if not pattern:
+    pattern = keywords if isinstance(keywords, re.Pattern) else _keyword_pattern(keywords or ())
+    if pattern is None:
         return pd.Series(False, index=series.index)
-    return series.str.contains(pattern, case=False, na=False)
+    if isinstance(series.dtype, pd.StringDtype):
+        # Arrow-backed strings run the regex in C++; they take the pattern text, not a compiled object
+        return series.str.contains(pattern.pattern, regex=True, na=False)
+    return series.str.contains(pattern, na=False)
+
+
+def _lowered_text(df: pd.DataFrame, column: str) -> pd.Series:
+    """Lowercased text column for keyword scans, Arrow-backed when pyarrow is available."""
+    if column not in df:
+        return pd.Series("", index=df.index)
+    if _TEXT_DTYPE is None:
+        return df[column].astype(str).str.lower()
+    return df[column].astype(_TEXT_DTYPE).str.lower()
 
 
 def categorize_transactions(df: pd.DataFrame) -> pd.DataFrame:
@@ -127,29 +178,50 @@ def categorize_transactions(df: pd.DataFrame) -> pd.DataFrame:
     if df is None:
         raise ValueError("DataFrame is None")
 
-    enriched = df.copy()
-    desc = enriched["description"].astype(str) if "description" in enriched else pd.Series("", index=enriched.index)
-    iban = enriched["iban"].astype(str) if "iban" in enriched else pd.Series("", index=enriched.index)
-
-    enriched["bk_category"] = pd.NA
-    enriched["bk_rule"] = pd.NA
-
-    for rule in RULES:
-        field = iban if rule["name"] == "iban" else desc
-        mask = enriched["bk_category"].isna() & _keyword_mask(field.str.lower(), rule["keywords"])
-        if mask.any():
-            enriched.loc[mask, "bk_category"] = rule["category"]
-            enriched.loc[mask, "bk_rule"] = rule["name"]
+    # Shallow copy: only new columns are assigned
+    enriched = df.copy(deep=False)
+    # Lowercase once; every rule scans the same arrays
+    desc = _lowered_text(enriched, "description")
+    iban = _lowered_text(enriched, "iban")
+
+    n_rows = len(enriched)
+    categories = np.full(n_rows, pd.NA, dtype=object)
+    rule_names = np.full(n_rows, pd.NA, dtype=object)
+    open_rows = np.ones(n_rows, dtype=bool)
+
+    # One sweep over the union of all keywords finds the rows any rule can claim;
+    # rule priority (first match wins) is then resolved on those rows only.
+    claimable = (
+        _keyword_mask(desc, _ANY_DESC_PATTERN).to_numpy(dtype=bool)
+        | _keyword_mask(iban, _ANY_IBAN_PATTERN).to_numpy(dtype=bool)
+    )
+    candidates = np.flatnonzero(claimable)
+    candidate_desc = desc.iloc[candidates]
+    candidate_iban = iban.iloc[candidates]
+    pending = np.ones(candidates.size, dtype=bool)
+    for rule, pattern in _RULE_PATTERNS:
+        if not pending.any():
+            break
+        field = candidate_iban if rule["name"] == "iban" else candidate_desc
+        hits_local = np.flatnonzero(pending)
+        hits_local = hits_local[_keyword_mask(field.iloc[hits_local], pattern).to_numpy(dtype=bool)]
+        hits = candidates[hits_local]
+        categories[hits] = rule["category"]
+        rule_names[hits] = rule["name"]
+        pending[hits_local] = False
+        open_rows[hits] = False
 
     if "amount" in enriched.columns:
-        amounts = pd.to_numeric(enriched["amount"], errors="coerce")
-        uncategorized = enriched["bk_category"].isna()
-        pos_mask = uncategorized & (amounts > 0)
-        neg_mask = uncategorized & (amounts < 0)
-        enriched.loc[pos_mask, "bk_category"] = "income"
-        enriched.loc[pos_mask, "bk_rule"] = "sign_positive"
-        enriched.loc[neg_mask, "bk_category"] = "cost"
-        enriched.loc[neg_mask, "bk_rule"] = "sign_negative"
+        amounts = pd.to_numeric(enriched["amount"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        pos_mask = open_rows & (amounts > 0)
+        neg_mask = open_rows & (amounts < 0)
+        categories[pos_mask] = "income"
+        rule_names[pos_mask] = "sign_positive"
+        categories[neg_mask] = "cost"
+        rule_names[neg_mask] = "sign_negative"
+
+    enriched["bk_category"] = categories
+    enriched["bk_rule"] = rule_names
 
     return enriched
 
@@ -163,13 +235,30 @@ def compute_bookkeeping_summaries(df: pd.DataFrame, tax_rate: float = 0.19) -> D
     if "amount" not in df.columns:
         raise ValueError("DataFrame must include an 'amount' column")
 
-    data = df.copy()
+    # Shallow copy: amount/bk_category are replaced, not written into
+    data = df.copy(deep=False)
     data["amount"] = pd.to_numeric(data["amount"], errors="coerce")
     data["bk_category"] = data.get("bk_category", pd.Series(pd.NA, index=data.index))
 
-    revenue = data.loc[data["bk_category"] == "income", "amount"].sum()
-    payroll = data.loc[data["bk_category"] == "payroll", "amount"].sum()
-    cost = data.loc[data["bk_category"].isin(["cost", "payroll"]), "amount"].sum()
+    # One grouping pass over the rows; every rollup and card is derived from this
+    # small (month, category) table. Undated rows land in a NaT month bucket.
+    has_dates = "date" in data.columns and pd.api.types.is_datetime64_any_dtype(data["date"])
+    keys = [data["bk_category"]]
+    if has_dates:
+        keys.insert(0, data["date"].dt.to_period("M").rename("year_month"))
+    base = data.groupby(keys, dropna=False, observed=True, sort=False)["amount"].sum().reset_index()
+
+    by_category = (
+        base.groupby("bk_category", dropna=False, observed=True)["amount"]
+        .sum()
+        .reset_index()
+        .rename(columns={"amount": "total"})
+    )
+    totals = by_category.set_index("bk_category")["total"]
+
+    revenue = totals.get("income", 0.0)
+    payroll = totals.get("payroll", 0.0)
+    cost = totals.get("cost", 0.0) + payroll
     profit = revenue + cost
     vat_base = revenue / (1 + tax_rate) if tax_rate else revenue
     vat_amount = revenue - vat_base
@@ -183,31 +272,21 @@ def compute_bookkeeping_summaries(df: pd.DataFrame, tax_rate: float = 0.19) -> D
         "payroll": float(payroll) if pd.notna(payroll) else 0.0,
     }
 
-    by_category = (
-        data.groupby("bk_category", dropna=False)["amount"]
-        .sum()
-        .reset_index()
-        .rename(columns={"amount": "total"})
-    )
-
     monthly = pd.DataFrame()
     quarterly = pd.DataFrame()
-    if "date" in data.columns and pd.api.types.is_datetime64_any_dtype(data["date"]):
-        dated = data.dropna(subset=["date"]).copy()
-        dated["year_month"] = dated["date"].dt.to_period("M").astype(str)
-        dated["year_quarter"] = dated["date"].dt.to_period("Q").astype(str)
-        monthly = (
-            dated.groupby(["year_month", "bk_category"], dropna=False)["amount"]
-            .sum()
-            .reset_index()
-            .sort_values(["year_month", "bk_category"])
-        )
+    if has_dates:
+        dated = base[base["year_month"].notna()]
         quarterly = (
-            dated.groupby(["year_quarter", "bk_category"], dropna=False)["amount"]
+            dated.assign(year_quarter=dated["year_month"].dt.asfreq("Q").astype(str))
+            .groupby(["year_quarter", "bk_category"], dropna=False, observed=True, sort=False)["amount"]
             .sum()
             .reset_index()
             .sort_values(["year_quarter", "bk_category"])
         )
+        monthly = (
+            dated.assign(year_month=dated["year_month"].astype(str))
+            .sort_values(["year_month", "bk_category"])
+        )
 
     return {
         "cards": cards,
@@ -240,20 +319,22 @@ def detect_recurring(df: pd.DataFrame, min_count: int = 3) -> pd.DataFrame:
     """
     if df is None:
         raise ValueError("DataFrame is None")
-    data = df.copy()
+    # Shallow copy: only the is_recurring column is added
+    data = df.copy(deep=False)
     if "iban" not in data.columns or "amount" not in data.columns:
         data["is_recurring"] = False
         return data
 
-    key_cols = ["iban", "amount"]
+    keys = [data["iban"], data["amount"]]
+    if pd.api.types.is_float_dtype(data["amount"]):
+        # Compare amounts in cents so float noise does not split a recurring group
+        keys[1] = data["amount"].mul(100).round()
     if "bk_category" in data.columns:
-        key_cols.append("bk_category")
-
-    grouped = data.groupby(key_cols).size().reset_index(name="cnt")
-    recurring = grouped[grouped["cnt"] >= min_count]
+        keys.append(data["bk_category"])
 
-    data = data.merge(recurring[key_cols].assign(is_recurring=True), on=key_cols, how="left")
-    data["is_recurring"] = data["is_recurring"].fillna(False)
+    # Group size broadcast back to the rows; NaN keys form no group and stay False
+    size = data.groupby(keys, observed=True, sort=False)["iban"].transform("size")
+    data["is_recurring"] = size.ge(min_count).to_numpy(dtype=bool)
     return data
 
 
@@ -266,9 +347,9 @@ def load_raw_transactions(path: str | Path) -> pd.DataFrame:
         raise FileNotFoundError(path)
 
     if path.suffix.lower() in {".xlsx", ".xls"}:
-        df = pd.read_excel(path)
+        df = pd.read_excel(path, engine=_excel_engine())
     elif path.suffix.lower() in {".csv"}:
-        df = pd.read_csv(path)
+        df = _read_csv_bytes(path.read_bytes(), ",")
     else:
         raise ValueError("Unsupported file type. Use .csv or .xlsx")
 
@@ -1,4 +1,6 @@
-from typing import List, Optional
+import functools
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import re
 from pydantic import BaseModel
@@ -36,51 +38,69 @@ def _is_time_col(df: pd.DataFrame, col: str) -> bool:
     return pd.api.types.is_datetime64_any_dtype(df[col])
 
 
+def _columns_where(df: pd.DataFrame, dtype_check) -> set:
+    """Columns whose dtype passes `dtype_check`, read from df.dtypes in one pass."""
+    return {col for col, dtype in df.dtypes.items() if dtype_check(dtype)}
+
+
+_HEAD_ROWS = 1000
+
+
+def _more_unique_than(series: pd.Series, cap: int, dropna: bool = True) -> bool:
+    """
+    Whether the series holds more than `cap` distinct values. The first rows
+    usually settle it for wide columns, so the full hash pass only runs when
+    the head stays at or under the cap.
+    """
+    if series.iloc[:_HEAD_ROWS].nunique(dropna=dropna) > cap:
+        return True
+    if len(series) <= _HEAD_ROWS:
+        return False
+    return series.nunique(dropna=dropna) > cap
+
+
 def get_valid_x_columns(df: pd.DataFrame) -> List[str]:
+    # Column-name checks are done once per column and reused below
+    id_like = {col: _is_id_like(col) for col in df.columns}
+    datetime_cols = _columns_where(df, pd.api.types.is_datetime64_any_dtype)
     cols: List[str] = []
+    time_cols: List[str] = []
     for col in df.columns:
-        if _is_id_like(col):
+        if id_like[col]:
             continue
         key = _normalize_column_key(col)
-        if any(token in key for token in X_TIME_KEYS + X_CATEGORY_KEYS):
-            cols.append(col)
-        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+        is_datetime = col in datetime_cols
+        if any(token in key for token in X_TIME_KEYS + X_CATEGORY_KEYS) or is_datetime:
             cols.append(col)
+            if is_datetime or any(token in key for token in X_TIME_KEYS):
+                time_cols.append(col)
     # Preserve original order; prioritize time columns first
-    time_cols = [c for c in cols if _is_time_col(df, c)]
     other_cols = [c for c in cols if c not in time_cols]
     prioritized = time_cols + other_cols
 
     # Fallback: if nothing matched heuristics, pick first non-id column(s)
     if not prioritized:
-        fallback = [c for c in df.columns if not _is_id_like(c)]
+        fallback = [c for c in df.columns if not id_like[c]]
         prioritized = fallback
 
     # Ensure remaining non-id columns are also considered (for categorical pies)
     for col in df.columns:
-        if col not in prioritized and not _is_id_like(col):
+        if col not in prioritized and not id_like[col]:
             prioritized.append(col)
 
     return prioritized
 
 
 def get_valid_y_columns(df: pd.DataFrame) -> List[str]:
-    cols: List[str] = []
-    for col in df.columns:
-        if _is_id_like(col):
-            continue
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            continue
-        key = _normalize_column_key(col)
-        if any(token in key for token in Y_MONEY_KEYS):
-            cols.append(col)
+    numeric = _columns_where(df, pd.api.types.is_numeric_dtype)
+    numeric_cols = [col for col in df.columns if col in numeric and not _is_id_like(col)]
+    cols: List[str] = [
+        col for col in numeric_cols
+        if any(token in _normalize_column_key(col) for token in Y_MONEY_KEYS)
+    ]
     # Fallback: if no money-like numeric columns, accept any numeric non-id columns
     if not cols:
-        for col in df.columns:
-            if _is_id_like(col):
-                continue
-            if pd.api.types.is_numeric_dtype(df[col]):
-                cols.append(col)
+        cols = numeric_cols
     # Last resort: allow a row-count pseudo column to enable charts
     if not cols:
         cols = ["__row_count__"]
@@ -93,7 +113,7 @@ def filter_x_candidates(df: pd.DataFrame, x_cols: List[str]) -> List[str]:
     for col in x_cols:
         if col not in df.columns:
             continue
-        if df[col].nunique(dropna=True) >= 2:
+        if _more_unique_than(df[col], 1):
             filtered.append(col)
     return filtered
 
@@ -102,16 +122,49 @@ def _series_almost_equal(a: pd.Series, b: pd.Series) -> bool:
     """Heuristic: treat two numeric series as duplicates if their difference is zero (ignoring NaNs)."""
     if a.empty and b.empty:
         return True
+    a_arr, b_arr = a.to_numpy(), b.to_numpy()
+    if a.index.equals(b.index) and a_arr.dtype.kind in "fiu" and b_arr.dtype.kind in "fiu":
+        # Same rule on the raw buffers: rows where both are present must match exactly
+        both = ~(np.isnan(a_arr) | np.isnan(b_arr)) if "f" in (a_arr.dtype.kind, b_arr.dtype.kind) else None
+        if both is not None:
+            if not both.any():
+                return False
+            a_arr, b_arr = a_arr[both], b_arr[both]
+        return bool(np.array_equal(a_arr, b_arr))
     diff = (pd.to_numeric(a, errors="coerce") - pd.to_numeric(b, errors="coerce")).abs()
     # If all non-null differences are zero, consider equal
     non_null = diff.dropna()
     return not non_null.empty and (non_null == 0).all()
 
 
+def _numeric_buffer(series: pd.Series) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """Raw numeric values and, for floats, the non-NaN mask; (None, None) for other dtypes."""
+    values = series.to_numpy()
+    if values.dtype.kind not in "fiu":
+        return None, None
+    return values, (~np.isnan(values) if values.dtype.kind == "f" else None)
+
+
+def _buffers_equal(a: np.ndarray, a_present, b: np.ndarray, b_present) -> bool:
+    """_series_almost_equal on buffers from _numeric_buffer for columns of the same frame."""
+    if a.size == 0 and b.size == 0:
+        return True
+    if a_present is None and b_present is None:
+        return bool(np.array_equal(a, b))
+    both = a_present if b_present is None else (b_present if a_present is None else a_present & b_present)
+    if not both.any():
+        return False
+    return bool(np.array_equal(a[both], b[both]))
+
+
+_AMOUNT_SUFFIX_RE = re.compile(r"_(total|gross|net)$")
+
+
+@functools.lru_cache(maxsize=4096, typed=True)
 def _simplify_name(name: str) -> str:
     key = _normalize_column_key(name)
     # remove common suffixes to catch near-duplicates like amount_total, amount_net
-    key = re.sub(r"_(total|gross|net)$", "", key)
+    key = _AMOUNT_SUFFIX_RE.sub("", key)
     return key
 
 
@@ -122,6 +175,8 @@ def deduplicate_y_candidates(df: pd.DataFrame, y_cols: List[str]) -> List[str]:
     """
     kept: List[str] = []
     simplified_keys: List[str] = []
+    # Per kept column: numeric series plus its raw buffer and present-mask, built once
+    kept_values: List[Tuple[pd.Series, Optional[np.ndarray], Optional[np.ndarray]]] = []
     for col in y_cols:
         if col == "__row_count__":
             if "__row_count__" not in kept:
@@ -130,30 +185,39 @@ def deduplicate_y_candidates(df: pd.DataFrame, y_cols: List[str]) -> List[str]:
         if col not in df.columns:
             continue
         series = pd.to_numeric(df[col], errors="coerce")
+        values, present = _numeric_buffer(series)
         simple = _simplify_name(col)
 
         is_dup = False
-        for kept_col, kept_key in zip(kept, simplified_keys):
-            other = pd.to_numeric(df[kept_col], errors="coerce")
-            if _series_almost_equal(series, other):
+        for kept_key, (other, other_values, other_present) in zip(simplified_keys, kept_values):
+            # Name check first: it is cheap and decides most near-duplicates
+            if simple == kept_key or simple in kept_key or kept_key in simple:
                 is_dup = True
                 break
-            if simple == kept_key or simple in kept_key or kept_key in simple:
+            if values is not None and other_values is not None:
+                same = _buffers_equal(values, present, other_values, other_present)
+            else:
+                same = _series_almost_equal(series, other)
+            if same:
                 is_dup = True
                 break
         if not is_dup:
             kept.append(col)
             simplified_keys.append(simple)
+            kept_values.append((series, values, present))
     return kept
 
 
-def build_chart_data(df: pd.DataFrame, x: str, y: str) -> ChartSpec:
+def build_chart_data(df: pd.DataFrame, x: str, y: str, is_time: Optional[bool] = None) -> ChartSpec:
     """
     Build a ChartSpec for a given x/y following rule:
       - time on x → line
       - else category → bar
+    `is_time` lets callers pass a precomputed _is_time_col(df, x).
     """
-    kind = "line" if _is_time_col(df, x) else "bar"
+    if is_time is None:
+        is_time = _is_time_col(df, x)
+    kind = "line" if is_time else "bar"
     if y == "__row_count__":
         title = f"Count over {x}" if kind == "line" else f"Count by {x}"
     else:
@@ -171,17 +235,21 @@ def generate_all_charts(df: pd.DataFrame) -> List[ChartSpec]:
     is_financial = bool(set(df.columns) & money_markers)
 
     for x in x_cols:
+        # Per-column facts are the same for every y; compute them once per x
+        x_is_time = _is_time_col(df, x)
+        few_unique = True
+        if not x_is_time:
+            try:
+                few_unique = not _more_unique_than(df[x], 20, dropna=False)
+            except Exception:
+                few_unique = True
         for y in y_cols:
             if x != y:
-                spec = build_chart_data(df, x, y)
+                spec = build_chart_data(df, x, y, is_time=x_is_time)
                 charts.append(spec)
                 # Prefer pie on categorical/grouped axes with manageable cardinality
-                if not _is_time_col(df, x):
-                    try:
-                        n_unique = df[x].nunique(dropna=False)
-                    except Exception:
-                        n_unique = None
-                    if n_unique is None or n_unique <= 20:
+                if not x_is_time:
+                    if few_unique:
                         try:
                             # Attempt pie; if later rendering fails, waterfall remains as a backup
                             title = (f"Count share by {x}" if y == "__row_count__" else f"{y} share by {x}")
@@ -1,9 +1,158 @@
+import functools
+import os
 import re
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
+from .utils import _DATE_TRANSLATE, format_dates, month_labels, shrink_int_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow ships with streamlit; fall back to the per-value parser
+    pa = None
+    pc = None
+
+# What float() accepts once currency, letters and separators are normalised
+_PLAIN_NUMBER = r"^\s*-?(\d+\.?\d*|\.\d+)\s*$"
+
+
+# Patterns used per cell or per column name, compiled once
+_CURRENCY_RE = re.compile(r"[€$£¥]")
+_LETTERS_RE = re.compile(r"[A-Za-z]")
+_LEADING_NON_NUMERIC_RE = re.compile(r"^[^0-9\-]+")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+_UNDERSCORE_RUN_RE = re.compile(r"_+")
+_SPACE_RUN_RE = re.compile(r"[\u00A0\s]+")
+
+# Column-name fragments that mark a column as monetary regardless of how many values parse
+_PRICE_HINTS = (
+    "price",
+    "preis",
+    "amount",
+    "cost",
+    "total",
+    "umsatz",
+    "betrag",
+    "summe",
+    "gross",
+    "net",
+    "vat",
+    "tax",
+    "payroll",
+)
+
+# Cell types _normalize_monetary_series passes through unchanged in mixed columns (bool excluded on purpose)
+_PLAIN_NUMBER_TYPES = (int, float, np.int64, np.int32, np.float64, np.float32)
+
+# Zero-width and non-breaking spaces become plain spaces before trimming
+_INVISIBLE_SPACES = str.maketrans(dict.fromkeys("\u00A0\u200b\u200c\u200d", " "))
+# Cell values _strip_strings treats as missing after trimming
+_EMPTY_TOKENS = frozenset({"", "nan", "None", "none", "null", "n/a", "na"})
+
+# Whitespace as matched by the regex \s, plus decimal comma → dot, for one-pass numeric cleanup
+_NUMERIC_TRANSLATE = str.maketrans({**{chr(c): None for c in range(0x3001) if chr(c).isspace()}, ",": "."})
+
+# Unambiguous layouts checked against a sample before the generic parser runs
+_DATE_LAYOUTS = (
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), "%Y-%m-%d"),
+    (re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$"), "%Y-%m-%d %H:%M:%S"),
+    (re.compile(r"^\d{2}\.\d{2}\.\d{4}$"), "%d.%m.%Y"),
+    (re.compile(r"^\d{2}\.\d{2}\.\d{4} \d{2}:\d{2}$"), "%d.%m.%Y %H:%M"),
+)
+
+
+# Uploads of the same export share their headers; typed so 1, 1.0 and True stay distinct
+@functools.lru_cache(maxsize=4096, typed=True)
+def _standard_column_name(name) -> str:
+    base = str(name).replace("\u00A0", " ").strip().lower()
+    base = _NON_WORD_RE.sub("_", base)
+    base = _UNDERSCORE_RUN_RE.sub("_", base).strip("_")
+    return base
+
+
+@functools.lru_cache(maxsize=64)
+def _hint_pattern(hints: tuple) -> re.Pattern:
+    """One compiled alternation per hint tuple, so a name is scanned once instead of once per hint."""
+    return re.compile("|".join(re.escape(hint) for hint in hints))
+
+
+def _columns_matching(columns: Iterable, hints: Iterable[str]) -> list:
+    """Columns whose lowercased name contains any of `hints`, in column order."""
+    search = _hint_pattern(tuple(hints)).search
+    return [col for col in columns if search(str(col).lower())]
+
+
+def _parsable_share(series: pd.Series) -> float:
+    """
+    Upper bound on the share of cells the numeric/monetary parsers can turn into
+    numbers: text needs a digit (or "inf"). Only all-text columns are scanned;
+    anything else reports 1.0 so the full parse still runs.
+    """
+    if pc is None or series.empty or series.dtype != object:
+        return 1.0
+    if pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return 1.0
+    arr = pa.array(series, type=pa.string(), from_pandas=True)
+    hits = pc.sum(pc.match_substring_regex(arr, r"\p{Nd}|(?i:inf)")).as_py() or 0
+    return hits / len(series)
+
+
+def _map_distinct_lowered(series: pd.Series, func) -> pd.Series:
+    """
+    Strip, lowercase and map each present value through `func`, once per distinct
+    value; HR fields have only a handful. Missing cells stay NA rather than being
+    stringified to "nan"/"<na>" first.
+    """
+    present = series.notna()
+    # Keyed on the stringified cell so True, 1 and 1.0 stay distinct, as with astype(str)
+    text = series[present].astype(str)
+    lookup = {value: func(value.strip().lower()) for value in pd.unique(text.to_numpy())}
+    out = pd.Series(pd.NA, index=series.index, dtype=object)
+    out[present] = text.map(lookup).astype(object)
+    return out
+
+
+def _normalize_date_text(series: pd.Series) -> pd.Series:
+    """Stringify, map non-breaking spaces to spaces and "/" to "-", then trim; one pass per step in Arrow."""
+    text = series.astype(str)
+    if pc is None:
+        values = np.array([value.translate(_DATE_TRANSLATE).strip() for value in text.to_numpy()], dtype=object)
+    else:
+        arr = pa.array(text.to_numpy(), type=pa.string())
+        arr = pc.replace_substring(pc.replace_substring(arr, "\u00A0", " "), "/", "-")
+        values = pc.utf8_trim_whitespace(arr).to_numpy(zero_copy_only=False)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _detect_datetime_format(series: pd.Series, sample: int = 100, min_ratio: float = 0.9):
+    """Return a strptime format matching at least `min_ratio` of the first `sample` values, else None."""
+    values = series.dropna().head(sample)
+    values = values[~values.isin(["nan", "<NA>", "NaT", "None"])]
+    if values.empty:
+        return None
+    for pattern, fmt in _DATE_LAYOUTS:
+        if values.str.match(pattern).mean() >= min_ratio:
+            return fmt
+    return None
+
+
+def _fill_unparsed(parsed: pd.Series, raw: pd.Series, **kwargs) -> pd.Series:
+    """
+    Re-parse only the rows an earlier to_datetime pass left as NaT.
+    Equivalent to parsed.fillna(pd.to_datetime(raw, ...)) when a format is given.
+    """
+    missing = parsed.isna() & raw.notna()
+    if not missing.any():
+        return parsed
+    parsed = parsed.copy()
+    parsed[missing] = pd.to_datetime(raw[missing], errors="coerce", cache=True, **kwargs)
+    return parsed
+
 
 class DataCleaner:
     """
@@ -21,126 +170,118 @@ class DataCleaner:
       9) drop duplicates
     """
 
-    def __init__(self, min_numeric_ratio: float = 0.7, min_date_ratio: float = 0.7):
+    def __init__(
+        self,
+        min_numeric_ratio: float = 0.7,
+        min_date_ratio: float = 0.7,
+        dedup_subset: Iterable[str] | None = None,
+    ):
         self.min_numeric_ratio = min_numeric_ratio
         self.min_date_ratio = min_date_ratio
+        # Columns (after name standardization) that identify a duplicate row; None compares whole rows
+        self.dedup_subset = tuple(dedup_subset) if dedup_subset is not None else None
         self.key_fields = {"date", "amount", "amount_net", "amount_gross"}
         
     def clean(self, df: pd.DataFrame) -> pd.DataFrame:
         if df is None:
             raise ValueError("DataFrame is None")
 
-        # Start pipeline
-        cleaned = df.copy()
+        # Start pipeline on a shallow copy: every step below replaces whole columns
+        # (or builds a new frame), so the caller's data is never written to
+        cleaned = df.copy(deep=False)
         cleaned = self._standardize_column_names(cleaned)
         cleaned = self._strip_strings(cleaned)
+        # Rows/cols that are empty once placeholders are NA only slow the coercions below
+        isna = cleaned.isna().to_numpy()
+        cleaned = cleaned.iloc[~isna.all(axis=1), ~isna.all(axis=0)]
         cleaned = self._coerce_price_like(cleaned)
         cleaned = self._coerce_numeric(cleaned)
+        # Whole-number columns drop to int32 where they fit; float amounts stay float64 for exact cents
+        cleaned = shrink_int_dtypes(cleaned)
         cleaned = self._coerce_dates(cleaned)
         cleaned = self._normalize_year_month(cleaned)
         cleaned = self._normalize_hr_fields(cleaned)
         cleaned = self._normalize_country(cleaned)
 
 
-        # Drop empty rows/cols
-        cleaned = cleaned.dropna(how="all")
-        cleaned = cleaned.dropna(axis=1, how="all")
-
-        # Drop invalid key rows
-        cleaned = self._drop_missing_key_fields(cleaned)
+        # Drop rows/cols emptied by coercion and placeholder finance rows with one missing-value
+        # matrix and a single selection. A column with any value keeps its row, so
+        # column emptiness is the same before or after dropping empty rows.
+        isna = cleaned.isna().to_numpy()
+        keep_rows = ~isna.all(axis=1)
+        keep_cols = ~isna.all(axis=0)
+        placeholder = self._missing_key_rows(cleaned.columns[keep_cols], isna[:, keep_cols])
+        if placeholder is not None:
+            keep_rows &= ~placeholder
+        cleaned = cleaned.iloc[keep_rows, keep_cols]
 
-        # Drop duplicates
-        cleaned = cleaned.drop_duplicates()
+        # Drop duplicates, hashing only the key columns when a subset is configured
+        subset = None
+        if self.dedup_subset is not None:
+            subset = [c for c in self.dedup_subset if c in cleaned.columns] or None
+        cleaned = cleaned.drop_duplicates(subset=subset)
 
         # --- enforce chronological order ---
         if "date" in cleaned.columns:
-            # try to convert to datetime for correct sorting
-            dt = pd.to_datetime(cleaned["date"], errors="coerce")
+            # try to convert to datetime for correct sorting; _coerce_dates wrote %m/%d/%y
+            dt = pd.to_datetime(cleaned["date"], errors="coerce", format="%m/%d/%y", cache=True)
             cleaned["date"] = dt
             cleaned = cleaned.sort_values("date", ascending=True)
             # drop time component and format to German-style DD.MM.YYYY
-            cleaned["date"] = cleaned["date"].dt.strftime("%d.%m.%Y")
+            cleaned["date"] = format_dates(cleaned["date"], "%d.%m.%Y")
 
         return cleaned
 
     def _standardize_column_names(self, df: pd.DataFrame) -> pd.DataFrame:
-        def normalize(name: str) -> str:
-            base = str(name).replace("\u00A0", " ").strip().lower()
-            base = re.sub(r"[^\w]+", "_", base)
-            base = re.sub(r"_+", "_", base).strip("_")
-            return base
-
-        df.columns = [normalize(c) for c in df.columns]
+        df.columns = [_standard_column_name(c) for c in df.columns]
         return df
 
     def _strip_strings(self, df: pd.DataFrame) -> pd.DataFrame:
         obj_cols = df.select_dtypes(include=["object"]).columns
         for col in obj_cols:
             series = df[col]
-            as_str = series.astype(str)
-            cleaned = (
-                as_str.str.replace(r"[\u00A0\u200b\u200c\u200d]", " ", regex=True)
-                .str.strip()
-                .replace(
-                    {
-                        "": pd.NA,
-                        "nan": pd.NA,
-                        "None": pd.NA,
-                        "none": pd.NA,
-                        "null": pd.NA,
-                        "n/a": pd.NA,
-                        "na": pd.NA,
-                    }
-                )
-            )
-            df[col] = cleaned.where(series.notna(), pd.NA)
+            missing = series.isna().to_numpy()
+            # One pass per cell: stringify, blank out invisible spaces, trim, map placeholders to NA
+            cleaned = [
+                pd.NA if is_na or (text := str(value).translate(_INVISIBLE_SPACES).strip()) in _EMPTY_TOKENS else text
+                for value, is_na in zip(series.to_numpy(), missing)
+            ]
+            df[col] = pd.Series(np.array(cleaned, dtype=object), index=series.index)
         return df
 
     def _coerce_price_like(self, df: pd.DataFrame) -> pd.DataFrame:
-        price_hints: Iterable[str] = (
-            "price",
-            "preis",
-            "amount",
-            "cost",
-            "total",
-            "umsatz",
-            "betrag",
-            "summe",
-            "gross",
-            "net",
-            "vat",
-            "tax",
-            "payroll",
-        )
-        for col in df.columns:
-            col_lower = str(col).lower()
-            series = df[col]
-            parsed = self._normalize_monetary_series(series)
-            ratio = parsed.notna().mean()
-            if any(hint in col_lower for hint in price_hints) or ratio >= self.min_numeric_ratio:
+        hinted = set(_columns_matching(df.columns, _PRICE_HINTS))
+        # Unhinted columns are only kept when enough values parse; skip those that cannot get there
+        columns = [
+            col for col in df.columns if col in hinted or _parsable_share(df[col]) >= self.min_numeric_ratio
+        ]
+        series_list = [df[col] for col in columns]
+        workers = min(len(columns), os.cpu_count() or 1)
+        if workers > 1 and pc is not None:
+            # Columns are independent and the Arrow kernels release the GIL
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parsed_list = list(executor.map(self._normalize_monetary_series, series_list))
+        else:
+            parsed_list = [self._normalize_monetary_series(series) for series in series_list]
+        for col, parsed in zip(columns, parsed_list):
+            if col in hinted or parsed.notna().mean() >= self.min_numeric_ratio:
                 df[col] = parsed
         return df
 
     def _coerce_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
         obj_cols = df.select_dtypes(include=["object"]).columns
         for col in obj_cols:
-            series = df[col].astype(str)
-            normalized = (
-                series.str.replace(r"[\u00A0\s]", "", regex=True)
-                .str.replace(",", ".", regex=False)
-            )
+            if _parsable_share(df[col]) < self.min_numeric_ratio:
+                continue
+            normalized = df[col].astype(str).str.translate(_NUMERIC_TRANSLATE)
             numerics = pd.to_numeric(normalized, errors="coerce")
             if numerics.notna().mean() >= self.min_numeric_ratio:
                 df[col] = numerics
         return df
     
     def _coerce_dates(self, df: pd.DataFrame) -> pd.DataFrame:
-        for col in df.columns:
-            name = col.lower()
-            # 只处理列名里包含这些关键词的列
-            if not any(hint in name for hint in ["date", "datum", "posted"]):
-                continue
-
+        # 只处理列名里包含这些关键词的列
+        for col in _columns_matching(df.columns, ("date", "datum", "posted")):
             series = df[col]
 
             if pd.api.types.is_datetime64_any_dtype(series):
@@ -148,21 +289,21 @@ class DataCleaner:
                 parsed = pd.to_datetime(series, errors="coerce")
             else:
                 # 先把各种奇怪空格和分隔符统一一下
-                series = (
-                    series.astype(str)
-                    .str.replace(r"[\u00A0]", " ", regex=True)
-                    .str.replace("/", "-", regex=False)
-                    .str.strip()
-                )
+                series = _normalize_date_text(series)
                 with warnings.catch_warnings():
                     warnings.filterwarnings("ignore", message="Could not infer format.*")
-                    # 第一轮：通用解析
-                    parsed = pd.to_datetime(series, errors="coerce")
+                    # 第一轮：样本能确定格式时直接按格式解析，否则通用解析
+                    fmt = _detect_datetime_format(series)
+                    if fmt:
+                        parsed = pd.to_datetime(series, errors="coerce", format=fmt, cache=True)
+                    else:
+                        parsed = pd.to_datetime(series, errors="coerce", cache=True)
                     # 第二轮：dayfirst=True（处理 31-05-1989 / 31.05.1989）
-                    parsed = parsed.fillna(
-                        pd.to_datetime(series, errors="coerce", dayfirst=True)
-                    )
-                    # 第三轮：指定格式兜底
+                    if parsed.isna().any():
+                        parsed = parsed.fillna(
+                            pd.to_datetime(series, errors="coerce", dayfirst=True, cache=True)
+                        )
+                    # 第三轮：指定格式兜底（只解析仍然缺失的行）
                     for fmt in (
                         "%d.%m.%Y",
                         "%d-%m-%Y",
@@ -170,53 +311,42 @@ class DataCleaner:
                         "%Y-%m-%d %H:%M:%S",
                         "%d.%m.%Y %H:%M",
                     ):
-                        parsed = parsed.fillna(
-                            pd.to_datetime(series, errors="coerce", format=fmt)
-                        )
+                        parsed = _fill_unparsed(parsed, series, format=fmt)
 
-            df[col] = parsed.dt.strftime("%m/%d/%y").where(parsed.notna(), pd.NA)
+            df[col] = format_dates(parsed, "%m/%d/%y", na_value=pd.NA)
 
         return df
 
     def _normalize_year_month(self, df: pd.DataFrame) -> pd.DataFrame:
-        ym_cols = [c for c in df.columns if "yearmonth" in c.lower() or "year_month" in c.lower() or "year-month" in c.lower()]
-        for col in ym_cols:
-            series = (
-                df[col]
-                .astype(str)
-                .str.replace("\u00A0", " ", regex=False)
-                .str.replace("/", "-", regex=False)
-                .str.strip()
-            )
+        for col in _columns_matching(df.columns, ("yearmonth", "year_month", "year-month")):
+            series = _normalize_date_text(df[col])
             with warnings.catch_warnings():
                 warnings.filterwarnings("ignore", message="Could not infer format.*")
-                parsed = pd.to_datetime(series, errors="coerce")
-                parsed = parsed.fillna(pd.to_datetime(series, errors="coerce", format="%b-%Y", dayfirst=False))
-                parsed = parsed.fillna(pd.to_datetime(series, errors="coerce", format="%m-%Y"))
-                parsed = parsed.fillna(pd.to_datetime(series, errors="coerce", format="%Y-%m"))
-            df[col] = parsed.dt.to_period("M").astype(str).where(parsed.notna(), pd.NA)
+                parsed = pd.to_datetime(series, errors="coerce", cache=True)
+                for fmt in ("%b-%Y", "%m-%Y", "%Y-%m"):
+                    parsed = _fill_unparsed(parsed, series, format=fmt)
+            df[col] = month_labels(parsed).where(parsed.notna(), pd.NA)
         return df
 
-    def _drop_missing_key_fields(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _missing_key_rows(self, columns: pd.Index, isna: np.ndarray):
         """
         Only drop placeholder rows for financial-looking tables:
         rows where the date is missing AND all amount-like columns are missing.
-        Non-financial tables skip this step entirely.
+        Non-financial tables skip this step entirely (returns None).
+        `isna` is the missing-value matrix for `columns`.
         """
         finance_markers = {"amount", "amount_net", "amount_gross", "vat_amount"}
-        if not (set(df.columns) & finance_markers):
-            return df
+        if not (set(columns) & finance_markers):
+            return None
 
-        amount_like = [c for c in df.columns if any(hint in c.lower() for hint in ["amount", "gross", "net", "betrag"])]
-        amount_like = list(dict.fromkeys(amount_like))
+        amount_like = set(_columns_matching(columns, ("amount", "gross", "net", "betrag")))
 
-        if "date" not in df.columns or not amount_like:
-            return df
+        if "date" not in columns or not amount_like:
+            return None
 
-        missing_date = df["date"].isna()
-        missing_amounts = df[amount_like].isna().all(axis=1)
-        keep_mask = ~(missing_date & missing_amounts)
-        return df.loc[keep_mask]
+        missing_date = isna[:, np.flatnonzero(columns == "date")].all(axis=1)
+        missing_amounts = isna[:, np.flatnonzero(columns.isin(amount_like))].all(axis=1)
+        return missing_date & missing_amounts
 
     def _normalize_monetary_series(self, series: pd.Series) -> pd.Series:
         def parse_value(val):
@@ -230,17 +360,17 @@ class DataCleaner:
                 return pd.NA
 
             # 去掉货币符号
-            text = re.sub(r"[€$£¥]", "", text)
+            text = _CURRENCY_RE.sub("", text)
             # 去掉不间断空格和普通空格
             text = text.replace("\u00A0", "").replace(" ", "")
             # 去掉所有字母（吃掉 "ca", "EUR" 等）
-            text = re.sub(r"[A-Za-z]", "", text)
+            text = _LETTERS_RE.sub("", text)
 
             if not text:
                 return pd.NA
 
             # 关键补丁：去掉前面残留的非数字（例如 ".2900" -> "2900"）
-            text = re.sub(r"^[^0-9\-]+", "", text)
+            text = _LEADING_NON_NUMERIC_RE.sub("", text)
             if not text:
                 return pd.NA
 
@@ -280,7 +410,81 @@ class DataCleaner:
             except Exception:
                 return pd.NA
 
-        return series.apply(parse_value)
+        def parse_all() -> pd.Series:
+            # Write straight into a float buffer; values parse_value passes through
+            # unchanged (ints, booleans, timestamps) need apply()'s object result
+            values = series.to_numpy()
+            out = np.empty(len(values), dtype=np.float64)
+            for i, val in enumerate(values):
+                parsed = parse_value(val)
+                if parsed is pd.NA:
+                    out[i] = np.nan
+                elif isinstance(parsed, float):
+                    out[i] = parsed
+                else:
+                    return series.apply(parse_value)
+            return pd.Series(out, index=series.index, name=series.name)
+
+        if pd.api.types.is_numeric_dtype(series):
+            return series
+        if pc is None or not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+            return parse_all()
+        kind = pd.api.types.infer_dtype(series, skipna=True)
+        if kind in ("string", "empty"):
+            return self._parse_monetary_strings(series)
+        if kind in ("mixed-integer-float", "mixed-integer", "mixed"):
+            # Spreadsheet columns often hold real numbers next to formatted text:
+            # numbers pass through, only the text cells go through the Arrow kernels
+            cell_types = series.map(type)
+            is_text = (cell_types == str).to_numpy()
+            is_number = cell_types.isin(_PLAIN_NUMBER_TYPES).to_numpy()
+            if (is_text | is_number | series.isna().to_numpy()).all():
+                values = series.to_numpy()
+                out = np.full(len(values), np.nan)
+                out[is_number] = values[is_number].astype(float)
+                out[is_text] = self._parse_monetary_strings(series[is_text]).to_numpy()
+                return pd.Series(out, index=series.index, name=series.name)
+        # Timestamps, booleans and other objects keep the per-value parser
+        return parse_all()
+
+    def _parse_monetary_strings(self, series: pd.Series) -> pd.Series:
+        """parse_value's rules as Arrow string kernels over a column of strings/missing values."""
+        text = pc.utf8_trim_whitespace(pa.array(series, type=pa.string(), from_pandas=True))
+        text = pc.replace_substring_regex(text, "[€$£¥\u00A0 A-Za-z]", "")
+        text = pc.replace_substring_regex(text, r"^[^0-9\-]+", "")
+
+        has_comma = pc.match_substring(text, ",")
+        has_dot = pc.match_substring(text, ".")
+        both = pc.and_(has_comma, has_dot)
+        only_comma = pc.and_(has_comma, pc.invert(has_dot))
+        only_dot = pc.and_(has_dot, pc.invert(has_comma))
+        # Last separator is the decimal point; a lone separator followed by exactly
+        # three characters is a thousands separator
+        dot_last = pc.match_substring_regex(text, r"\.[^,]*$")
+        comma_thousands = pc.match_substring_regex(text, r",[^,]{3}$")
+        dot_thousands = pc.match_substring_regex(text, r"\.[^.]{3}$")
+
+        no_comma = pc.replace_substring(text, ",", "")
+        no_dot = pc.replace_substring(text, ".", "")
+        normalized = pc.if_else(
+            pc.or_(pc.and_(both, dot_last), pc.and_(only_comma, comma_thousands)),
+            no_comma,
+            pc.if_else(
+                both,
+                pc.replace_substring(no_dot, ",", "."),
+                pc.if_else(
+                    only_comma,
+                    pc.replace_substring(text, ",", "."),
+                    pc.if_else(pc.and_(only_dot, dot_thousands), no_dot, text),
+                ),
+            ),
+        )
+
+        numbers = pc.if_else(
+            pc.match_substring_regex(normalized, _PLAIN_NUMBER), pc.utf8_trim_whitespace(normalized), None
+        )
+        values = pc.cast(numbers, pa.float64()).to_numpy(zero_copy_only=False)
+        return pd.Series(values, index=series.index, name=series.name)
 
     def _normalize_hr_fields(self, df: pd.DataFrame) -> pd.DataFrame:
         cols_lower = {c.lower(): c for c in df.columns}
@@ -306,7 +510,6 @@ class DataCleaner:
         for key in ["vertragsart", "employment_type", "contract_type"]:
             if key in cols_lower:
                 col = cols_lower[key]
-                s = df[col].astype(str).str.strip().str.lower()
                 def map_contract(x: str) -> str | type(pd.NA):
                     if x in ("nan", ""):
                         return pd.NA
@@ -318,7 +521,7 @@ class DataCleaner:
                         return "temporary"
                     return x  # keep as-is for now
 
-                df[col] = s.map(map_contract)
+                df[col] = _map_distinct_lowered(df[col], map_contract)
 
         # 货币：统一成大写代码
         for key in ["waehrung", "currency"]:
@@ -343,7 +546,6 @@ class DataCleaner:
         for key in ["zahlfrequenz", "pay_frequency", "payment_frequency"]:
             if key in cols_lower:
                 col = cols_lower[key]
-                s = df[col].astype(str).str.strip().str.lower()
                 def map_freq(x: str) -> str | type(pd.NA):
                     if x in ("nan", ""):
                         return pd.NA
@@ -353,14 +555,12 @@ class DataCleaner:
                         return "yearly"
                     return x
 
-                df[col] = s.map(map_freq)
+                df[col] = _map_distinct_lowered(df[col], map_freq)
 
         for key in ["status", "employment_status"]:
             if key in cols_lower:
                 col = cols_lower[key]
 
-                s = df[col].astype(str).str.strip().str.lower()
-
                 def map_status(x: str):
                     if x in ("", "nan"):
                         return pd.NA
@@ -373,7 +573,7 @@ class DataCleaner:
                     # 其它值原样保留（以防有第三种状态，比如 "on_leave"）
                     return x
 
-                df[col] = s.map(map_status)
+                df[col] = _map_distinct_lowered(df[col], map_status)
 
         return df
     
@@ -417,7 +617,7 @@ class DataCleaner:
             df[col]
             .astype(str)
             .str.strip()
-            .str.replace(r"[\u00A0\s]+", "", regex=True)
+            .str.replace(_SPACE_RUN_RE, "", regex=True)
             .str.lower()
         )
 
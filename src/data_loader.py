@@ -7,6 +7,52 @@ import requests
 
 from .data_cleaner import cleaner
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow ships with streamlit; keep the pandas reader as fallback
+    pa = None
+    pa_csv = None
+
+
+def _read_csv_bytes(raw: bytes, sep: str) -> pd.DataFrame:
+    """
+    Parse CSV bytes with pyarrow's multithreaded reader, falling back to pandas.
+    Column dtypes match pd.read_csv: date-like text stays text for the cleaner to parse.
+    """
+    if pa_csv is not None:
+        read_options = pa_csv.ReadOptions(block_size=1 << 20)
+        parse_options = pa_csv.ParseOptions(delimiter=sep)
+        try:
+            # pyarrow infers ISO timestamps; keep them as strings like pandas does
+            schema = pa_csv.open_csv(io.BytesIO(raw), read_options=read_options, parse_options=parse_options).schema
+            names = schema.names
+            if names and all(names) and len(set(names)) == len(names):
+                convert_options = pa_csv.ConvertOptions(
+                    strings_can_be_null=True,
+                    column_types={f.name: pa.string() for f in schema if pa.types.is_temporal(f.type)},
+                )
+                table = pa_csv.read_csv(
+                    io.BytesIO(raw),
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options,
+                )
+                return table.to_pandas()
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+    # Blank/duplicate headers, ragged rows or type drift across blocks: let pandas handle it
+    return pd.read_csv(io.BytesIO(raw), sep=sep, engine="python")
+
+
+def _excel_engine():
+    """Prefer the Rust-based calamine reader when python-calamine is installed."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return "calamine"
+
 def _detect_delimiter(raw: bytes) -> str:
     head = raw[:2048].decode("utf-8", errors="ignore")
     try:
@@ -24,7 +70,7 @@ def load_from_upload(uploaded, clean: bool = True) -> Tuple[pd.DataFrame, str]:
 
     # Excel 直接读
     if name.lower().endswith(".xlsx"):
-        df = pd.read_excel(uploaded)
+        df = pd.read_excel(uploaded, engine=_excel_engine())
         if clean:
             df = cleaner.clean(df)
         return df, name
@@ -35,7 +81,7 @@ def load_from_upload(uploaded, clean: bool = True) -> Tuple[pd.DataFrame, str]:
 
     if sep == ",":
         # 逗号 CSV：直接按逗号读（不做任何清洗）
-        df = pd.read_csv(io.BytesIO(raw), sep=",", engine="python")
+        df = _read_csv_bytes(raw, ",")
         if clean:
             df = cleaner.clean(df)
 
@@ -48,7 +94,7 @@ def load_from_upload(uploaded, clean: bool = True) -> Tuple[pd.DataFrame, str]:
 
     else:
         # 分号 CSV：按分号读
-        df = pd.read_csv(io.BytesIO(raw), sep=";", engine="python")
+        df = _read_csv_bytes(raw, ";")
     if clean:
         df = cleaner.clean(df)
     return df, name
@@ -58,7 +104,7 @@ def load_from_gsheet_url(url: str, clean: bool = True) -> Tuple[pd.DataFrame, st
     r = requests.get(url, timeout=20)
     r.raise_for_status()
     content = r.content
-    df = pd.read_csv(io.BytesIO(content))
+    df = _read_csv_bytes(content, ",")
     if clean:
         df = cleaner.clean(df)
     return df, "GoogleSheets.csv"
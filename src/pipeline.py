@@ -2,23 +2,46 @@ from __future__ import annotations
 
 from pathlib import Path
 import warnings
-from typing import Dict, Iterable, List, Optional, Union
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
 
 import pandas as pd
 
 from .bookkeeping import (
     COLUMN_ALIASES,
+    canonical_rename_map,
     categorize_transactions,
     compute_bookkeeping_summaries,
     detect_recurring,
     standardize_columns,
     _normalize_column_key,
 )
-from .data_cleaner import cleaner
+from .data_cleaner import _parsable_share, cleaner
+from .data_loader import _excel_engine, _read_csv_bytes
 
 
-def _log(debug: bool, logs: List[str], msg: str) -> None:
-    """Collect debug logs and optionally print for local debugging."""
+_AMOUNT_ALIASES = frozenset(COLUMN_ALIASES["amount"])
+_DATE_ALIASES = frozenset(COLUMN_ALIASES["date"])
+_DESCRIPTION_ALIASES = frozenset(COLUMN_ALIASES["description"])
+
+# P&L summary roles and their column keys, in order of preference
+_PNL_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "revenue": ("revenue_net", "revenue", "income", "sales", "umsatz_netto"),
+    "cost": ("cost_net", "cost", "expenses", "expense"),
+    "payroll": ("payroll_net", "payroll", "salaries", "salary"),
+    "profit": ("profit_after_tax", "profit_before_tax", "profit"),
+    "vat": ("vat_paid", "vat_amount", "total_vat_collected", "vat"),
+}
+
+
+def _log(debug: bool, logs: List[str], msg: Union[str, Callable[[], str]]) -> None:
+    """
+    Collect debug logs and optionally print for local debugging.
+    Callable messages are debug-only details: built and recorded only when `debug` is set.
+    """
+    if callable(msg):
+        if not debug:
+            return
+        msg = msg()
     logs.append(msg)
     if debug:
         print(f"[pipeline] {msg}")
@@ -26,33 +49,70 @@ def _log(debug: bool, logs: List[str], msg: str) -> None:
 
 def _load_source(source: Union[str, Path, pd.DataFrame]) -> pd.DataFrame:
     if isinstance(source, pd.DataFrame):
-        return source.copy()
+        # clean() never mutates its input, so sharing the column arrays is safe
+        return source.copy(deep=False)
 
     path = Path(source)
     if not path.exists():
         raise FileNotFoundError(path)
 
-    if path.suffix.lower() in {".xlsx", ".xls"}:
+    if path.suffix.lower() == ".xlsx":
+        return pd.read_excel(path, engine=_excel_engine())
+    if path.suffix.lower() == ".xls":
         return pd.read_excel(path)
     if path.suffix.lower() == ".csv":
-        return pd.read_csv(path)
+        return _read_csv_bytes(path.read_bytes(), ",")
     raise ValueError("Unsupported file type. Use .csv or .xlsx")
 
 
-def _find_candidates(columns: Iterable[str], targets: Iterable[str]) -> List[str]:
-    target_set = set(targets)
-    matches: List[str] = []
-    for col in columns:
-        key = _normalize_column_key(col)
-        if key in target_set:
-            matches.append(col)
-    return matches
+def _find_candidates(column_keys: Iterable[Tuple[str, str]], targets: FrozenSet[str]) -> List[str]:
+    """Columns whose normalized key (from `(column, key)` pairs) is one of `targets`."""
+    return [col for col, key in column_keys if key in targets]
+
 
+def _parsed_share(values: pd.Series) -> float:
+    """Share of `values` that parse as dates; ISO 8601 columns skip pandas' format inference."""
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="Could not infer format.*")
+        iso = pd.to_datetime(values, errors="coerce", format="ISO8601").notna().mean()
+        if iso >= 0.9:
+            return iso
+        return pd.to_datetime(values, errors="coerce").notna().mean()
 
-def detect_bookkeeping_table(df: pd.DataFrame) -> Dict:
+
+def _date_share(series: pd.Series, sample_size: int = 1000, margin: float = 0.1) -> float:
+    """
+    Share of values pd.to_datetime can parse, estimated from the first `sample_size`
+    non-null values (to_datetime infers its format from the first one either way).
+    Estimates within `margin` of the 0.6 date threshold are re-checked on the full column.
+    """
+    non_null = series.dropna()
+    if len(non_null) > sample_size:
+        estimate = _parsed_share(non_null.iloc[:sample_size]) * len(non_null) / len(series)
+        if abs(estimate - 0.6) >= margin:
+            return estimate
+    return _parsed_share(series)
+
+
+def _numeric_share(series: pd.Series) -> float:
+    """Share of values pd.to_numeric can parse; numeric columns and mostly-text columns skip the parse."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.notna().mean()
+    upper_bound = _parsable_share(series)
+    if upper_bound < 0.5:
+        return upper_bound
+    return pd.to_numeric(series, errors="coerce").notna().mean()
+
+
+def _column_keys(columns: Iterable[str]) -> List[Tuple[str, str]]:
+    return [(c, _normalize_column_key(c)) for c in columns]
+
+
+def detect_bookkeeping_table(df: pd.DataFrame, column_keys: Optional[List[Tuple[str, str]]] = None) -> Dict:
     """
     Heuristic detection of transaction-like tables.
     Returns candidates and a looks_bookkeeping flag to steer auto mode.
+    `column_keys` are precomputed `(column, normalized key)` pairs for df.columns.
     """
     if df is None or df.empty:
         return {
@@ -63,41 +123,33 @@ def detect_bookkeeping_table(df: pd.DataFrame) -> Dict:
             "description_candidates": [],
         }
 
-    normalized_cols = {_normalize_column_key(c): c for c in df.columns}
-    amount_candidates = _find_candidates(df.columns, COLUMN_ALIASES["amount"])
-    date_candidates = _find_candidates(df.columns, COLUMN_ALIASES["date"])
-    desc_candidates = _find_candidates(df.columns, COLUMN_ALIASES["description"])
+    if column_keys is None:
+        column_keys = _column_keys(df.columns)
+    normalized_cols = {key: c for c, key in column_keys}
+    amount_candidates = _find_candidates(column_keys, _AMOUNT_ALIASES)
+    date_candidates = _find_candidates(column_keys, _DATE_ALIASES)
+    desc_candidates = _find_candidates(column_keys, _DESCRIPTION_ALIASES)
 
     # Also consider numeric columns with money-ish names
-    for col in df.columns:
-        key = _normalize_column_key(col)
+    for col, key in column_keys:
         if "amount" in key or "umsatz" in key or "betrag" in key or "total" in key:
             if col not in amount_candidates:
                 amount_candidates.append(col)
 
-    date_like = []
-    for col in df.columns:
-        series = df[col]
-        if pd.api.types.is_datetime64_any_dtype(series):
-            date_like.append(col)
-            continue
-        if pd.api.types.is_numeric_dtype(series):
-            continue
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", message="Could not infer format.*")
-            parsed = pd.to_datetime(series, errors="coerce")
-        if parsed.notna().mean() >= 0.6:
-            date_like.append(col)
+    # Parse column values only when no column is named like a date
     if not date_candidates:
-        date_candidates = date_like
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                date_candidates.append(col)
+                continue
+            if pd.api.types.is_numeric_dtype(series):
+                continue
+            if _date_share(series) >= 0.6:
+                date_candidates.append(col)
 
     # sanity check: do we have a numeric amount column?
-    numeric_amounts = []
-    for col in amount_candidates:
-        numerics = pd.to_numeric(df[col], errors="coerce")
-        if numerics.notna().mean() >= 0.5:
-            numeric_amounts.append(col)
-    amount_candidates = numeric_amounts
+    amount_candidates = [col for col in amount_candidates if _numeric_share(df[col]) >= 0.5]
 
     looks_bookkeeping = bool(amount_candidates) and (bool(date_candidates) or bool(desc_candidates))
     reason = "found amount/date/description pattern" if looks_bookkeeping else "missing amount/date pattern"
@@ -119,35 +171,38 @@ def detect_bookkeeping_table(df: pd.DataFrame) -> Dict:
     }
 
 
-def detect_pnl_summary(df: pd.DataFrame) -> Dict:
+def _renamed_detection(detection: Dict, rename_map: Dict[str, str], columns: Iterable[str]) -> Dict:
+    """Carry a detect_bookkeeping_table result over to `columns`, renamed from the originals by `rename_map`."""
+    def rename(cols: List[str]) -> List[str]:
+        return [rename_map.get(c, c) for c in cols]
+
+    renamed = dict(detection)
+    for key in ("amount_candidates", "date_candidates", "description_candidates"):
+        renamed[key] = rename(detection[key])
+    renamed["selected"] = {
+        role: rename_map.get(col, col) if col is not None else None for role, col in detection["selected"].items()
+    }
+    renamed["normalized_columns"] = list(dict.fromkeys(_normalize_column_key(c) for c in columns))
+    return renamed
+
+
+def detect_pnl_summary(df: pd.DataFrame, column_keys: Optional[List[Tuple[str, str]]] = None) -> Dict:
     """
     Detect pre-aggregated P&L-style summaries (e.g., Revenue_Net/Cost_Net/Payroll_Net/Profit).
     """
     if df is None or df.empty:
         return {"looks_pnl": False, "columns": {}, "cards": {}}
 
-    norm_map = {_normalize_column_key(c): c for c in df.columns}
-
-    def pick(keys: Iterable[str]) -> Optional[str]:
-        for k in keys:
-            if k in norm_map:
-                return norm_map[k]
-        return None
-
-    revenue_col = pick(["revenue_net", "revenue", "income", "sales", "umsatz_netto"])
-    cost_col = pick(["cost_net", "cost", "expenses", "expense"])
-    payroll_col = pick(["payroll_net", "payroll", "salaries", "salary"])
-    profit_col = pick(["profit_after_tax", "profit_before_tax", "profit"])
-    vat_col = pick(["vat_paid", "vat_amount", "total_vat_collected", "vat"])
-
-    looks_pnl = any([revenue_col, cost_col, payroll_col, profit_col, vat_col])
-    columns = {
-        "revenue": revenue_col,
-        "cost": cost_col,
-        "payroll": payroll_col,
-        "profit": profit_col,
-        "vat": vat_col,
+    if column_keys is None:
+        column_keys = _column_keys(df.columns)
+    norm_map = {key: c for c, key in column_keys}
+
+    columns: Dict[str, Optional[str]] = {
+        role: next((norm_map[k] for k in keys if k in norm_map), None) for role, keys in _PNL_ALIASES.items()
     }
+    revenue_col, cost_col, payroll_col, profit_col, vat_col = columns.values()
+
+    looks_pnl = any(columns.values())
 
     if not looks_pnl:
         return {"looks_pnl": False, "columns": columns, "cards": {}}
@@ -155,7 +210,10 @@ def detect_pnl_summary(df: pd.DataFrame) -> Dict:
     def sum_col(col_name: Optional[str]) -> float:
         if not col_name or col_name not in df.columns:
             return 0.0
-        return float(pd.to_numeric(df[col_name], errors="coerce").sum())
+        values = df[col_name]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        return float(values.sum())
 
     revenue = sum_col(revenue_col)
     cost = sum_col(cost_col)
@@ -196,19 +254,21 @@ def process_uploaded_file(
     logs: List[str] = []
     raw = _load_source(source)
     cleaned = cleaner.clean(raw)
-    _log(debug, logs, f"Cleaned DataFrame head:\n{cleaned.head(5)}")
+    _log(debug, logs, lambda: f"Cleaned DataFrame head:\n{cleaned.head(5)}")
 
-    detection = detect_bookkeeping_table(cleaned)
+    column_keys = _column_keys(cleaned.columns)
+    detection = detect_bookkeeping_table(cleaned, column_keys)
+    detected_by_pattern = detection["looks_bookkeeping"]
     # If a BK category and amount-like columns exist but detection failed, allow bookkeeping
     if not detection["looks_bookkeeping"]:
-        bk_cols = [c for c in cleaned.columns if _normalize_column_key(c) in {"bk_category", "category"}]
-        amount_like = [c for c in cleaned.columns if "amount" in _normalize_column_key(c)]
+        bk_cols = [c for c, key in column_keys if key in {"bk_category", "category"}]
+        amount_like = [c for c, key in column_keys if "amount" in key]
         if bk_cols and amount_like:
             detection["looks_bookkeeping"] = True
             detection["reason"] = "found bk_category with amount columns"
             detection["selected"]["amount"] = amount_like[0]
             detection["selected"]["description"] = bk_cols[0]
-    pnl_summary = detect_pnl_summary(cleaned)
+    pnl_summary = detect_pnl_summary(cleaned, column_keys)
     chosen_mode = mode
     if mode == "auto":
         chosen_mode = "bookkeeping" if (detection["looks_bookkeeping"] or pnl_summary["looks_pnl"]) else "generic"
@@ -250,7 +310,11 @@ def process_uploaded_file(
         return result
 
     standardized = standardize_columns(cleaned)
-    bk_detect = detect_bookkeeping_table(standardized)
+    if detected_by_pattern:
+        # standardize_columns only renames the matched columns: reuse the first pass
+        bk_detect = _renamed_detection(detection, canonical_rename_map(cleaned.columns), standardized.columns)
+    else:
+        bk_detect = detect_bookkeeping_table(standardized)
     _log(
         debug,
         logs,
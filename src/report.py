@@ -1,14 +1,17 @@
 # src/report.py
+import functools
 import io
-from typing import List, Optional
+import struct
+from typing import BinaryIO, List, Optional, Tuple
 
 import pandas as pd
 import plotly.io as pio
 
 from .chart_suggester import ChartSpec
-from .viz import render_chart
+from .viz import aggregate_specs, chart_data_key, render_chart
 
 
+@functools.lru_cache(maxsize=1)
 def _require_reportlab():
     try:
         from reportlab.lib.pagesizes import A4
@@ -22,6 +25,7 @@ def _require_reportlab():
         ) from e
 
 
+@functools.lru_cache(maxsize=1)
 def _require_pillow():
     try:
         from PIL import Image
@@ -43,7 +47,14 @@ def kaleido_available() -> bool:
     return getattr(pio, "kaleido", None) is not None
 
 
-def _fig_to_png_bytes(fig) -> bytes:
+def _kaleido_scope():
+    """
+    Return Plotly's long-lived kaleido scope, or None when Plotly has not created one.
+    """
+    return getattr(getattr(pio, "kaleido", None), "scope", None)
+
+
+def _fig_to_png_bytes(fig, scope=None, scale: float = 2) -> bytes:
     """
     Convert a Plotly figure to PNG bytes using kaleido backend.
     Requires `kaleido` (listed in requirements.txt).
@@ -53,12 +64,18 @@ def _fig_to_png_bytes(fig) -> bytes:
             "Plotly static export failed because `kaleido` is missing. "
             "Install with `pip install -r requirements.txt` in the same environment and restart the app."
         )
+
+    def _export(scale: float) -> bytes:
+        if scope is not None:
+            return scope.transform(fig.to_dict(), format="png", scale=scale)
+        return pio.to_image(fig, format="png", engine="kaleido", scale=scale, validate=False)
+
     try:
-        return pio.to_image(fig, format="png", engine="kaleido", scale=2, validate=False)
+        return _export(scale)
     except Exception as e_high_res:
         # Retry with a smaller export to avoid memory/driver issues on some hosts (e.g., Streamlit Cloud)
         try:
-            return pio.to_image(fig, format="png", engine="kaleido", scale=1, validate=False)
+            return _export(min(scale, 1))
         except Exception as e:
             raise RuntimeError(
                 "Plotly static export failed even though `kaleido` is installed. "
@@ -66,6 +83,46 @@ def _fig_to_png_bytes(fig) -> bytes:
             ) from e
 
 
+def _fit_scale(fig, max_w: float, max_h: float) -> float:
+    """
+    Export scale at which `fig` renders no larger than (max_w, max_h) pixels, capped at 2x.
+    Unset figure sizes fall back to kaleido's 700x500 default.
+    """
+    width = fig.layout.width or 700
+    height = fig.layout.height or 500
+    return min(2.0, max_w / width, max_h / height)
+
+
+def _figs_to_png_bytes(figs, max_size: Optional[Tuple[float, float]] = None) -> List[bytes]:
+    """
+    Export all figures through one kaleido scope so every chart reuses the same
+    Chromium subprocess and skips Plotly's per-call figure validation.
+    With `max_size`, each figure is rendered directly at a size that fits it.
+    """
+    scope = _kaleido_scope()
+    return [
+        _fig_to_png_bytes(fig, scope=scope, scale=2 if max_size is None else _fit_scale(fig, *max_size))
+        for fig in figs
+    ]
+
+
+def _png_size(png_bytes: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read (width, height) from the PNG header without decoding the image; None if not a PNG.
+    """
+    if png_bytes[:8] != b"\x89PNG\r\n\x1a\n" or png_bytes[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", png_bytes[16:24])
+
+
+def _fit_size(width: int, height: int, max_w: float, max_h: float) -> Tuple[float, float]:
+    """
+    Shrink (width, height) to fit inside (max_w, max_h), keeping the aspect ratio; never enlarges.
+    """
+    ratio = min(1.0, max_w / width, max_h / height)
+    return width * ratio, height * ratio
+
+
 def build_pdf_report(
     df: pd.DataFrame,
     specs: List[ChartSpec],
@@ -73,17 +130,19 @@ def build_pdf_report(
     brand: str,
     theme: str,
     insights: Optional[str] = None,
-) -> bytes:
+    output: Optional[BinaryIO] = None,
+    figures: Optional[List] = None,
+) -> Optional[bytes]:
     """
     Build a multi-page PDF:
       - Cover page with title, brand, and optional insights
       - One page per chart in `specs`
-    Returns PDF bytes.
+    `figures` are already rendered charts for `specs` (same order); they are built here when omitted.
+    Returns PDF bytes, or writes the PDF to the binary file `output` and returns None.
     """
     A4, canvas, cm, ImageReader = _require_reportlab()
-    Image = _require_pillow()
 
-    buf = io.BytesIO()
+    buf = io.BytesIO() if output is None else output
     c = canvas.Canvas(buf, pagesize=A4)
     W, H = A4
 
@@ -101,18 +160,22 @@ def build_pdf_report(
     c.showPage()
 
     # Chart pages
-    for spec in specs:
-        fig = render_chart(df, spec, theme=theme)
-        png_bytes = _fig_to_png_bytes(fig)
-
-        img = Image.open(io.BytesIO(png_bytes))
-        # Fit to page margins
-        max_w, max_h = W - 3 * cm, H - 4 * cm
-        img.thumbnail((int(max_w), int(max_h)))
-
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format="PNG")
-        img_bytes.seek(0)
+    figs = figures
+    if figs is None:
+        aggregates = aggregate_specs(df, specs)
+        figs = [
+            render_chart(df, spec, theme=theme, data=aggregates.get(chart_data_key(df, spec)))
+            for spec in specs
+        ]
+    # Fit to page margins: kaleido renders at the page size, so the PNG is embedded as exported
+    max_w, max_h = int(W - 3 * cm), int(H - 4 * cm)
+    pngs = _figs_to_png_bytes(figs, max_size=(max_w, max_h))
+    for spec, png_bytes in zip(specs, pngs):
+
+        size = _png_size(png_bytes)
+        if size is None:
+            size = _require_pillow().open(io.BytesIO(png_bytes)).size
+        img_w, img_h = _fit_size(*size, max_w, max_h)
 
         def _describe_chart(s: ChartSpec) -> str:
             base = f"{s.kind.capitalize()} chart"
@@ -148,16 +211,17 @@ def build_pdf_report(
         c.drawText(textobj)
 
         c.drawImage(
-            ImageReader(img_bytes),
+            ImageReader(io.BytesIO(png_bytes)),
             1.5 * cm,
             2.5 * cm,
-            width=img.width,
-            height=img.height,
+            width=img_w,
+            height=img_h,
             preserveAspectRatio=True,
             mask="auto",
         )
         c.showPage()
 
     c.save()
-    buf.seek(0)
-    return buf.read()
+    if output is not None:
+        return None
+    return buf.getvalue()
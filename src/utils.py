@@ -1,6 +1,77 @@
 import warnings
+import numpy as np
 import pandas as pd
 
+# Date text cleanup shared by detect_time_column and the cleaner: NBSP → space, "/" → "-"
+_DATE_TRANSLATE = str.maketrans({"\u00A0": " ", "/": "-"})
+
+
+def df_fingerprint(df: pd.DataFrame, sample_rows: int = 256) -> tuple:
+    """
+    Cheap cache key for a DataFrame: shape, columns, dtypes and a hash of up to
+    `sample_rows` evenly spaced rows (always including the first and last).
+    Cost is independent of the row count; frames that only differ in unsampled
+    rows collide, which is acceptable for per-upload UI caching.
+    """
+    n_rows = len(df)
+    positions = np.unique(np.linspace(0, max(n_rows - 1, 0), num=min(n_rows, sample_rows)).astype(np.int64))
+    sample_hash = pd.util.hash_pandas_object(df.iloc[positions], index=True).values.tobytes()
+    return (df.shape, tuple(df.columns), tuple(map(str, df.dtypes)), sample_hash)
+
+
+def shrink_int_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store int64 columns as int32 when every value fits, halving their memory.
+    Narrower ints overflow in element-wise arithmetic and float32 totals lose
+    cents, so floats and text columns are left as they are.
+    """
+    info = np.iinfo(np.int32)
+    narrow = {
+        col: np.int32
+        for col in df.select_dtypes(include=["int64"]).columns
+        if df[col].empty or (df[col].min() >= info.min and df[col].max() <= info.max)
+    }
+    return df.astype(narrow) if narrow else df
+
+
+def month_labels(dates: pd.Series) -> pd.Series:
+    """
+    "YYYY-MM" strings for a datetime series, "NaT" where missing, matching
+    dates.dt.to_period("M").astype(str). Only the distinct months are formatted.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.dt.to_period("M").astype(str)
+    if getattr(dates.dt, "tz", None) is not None:
+        # to_period works on local wall time
+        dates = dates.dt.tz_localize(None)
+    codes, months = pd.factorize(dates.to_numpy().astype("datetime64[M]"))
+    labels = np.append(np.asarray(months).astype("datetime64[M]").astype(str).astype(object), "NaT")
+    # factorize marks NaT with -1, which indexes the trailing "NaT" label
+    return pd.Series(labels[codes], index=dates.index, name=dates.name)
+
+
+def parse_dates(values: pd.Series, **kwargs) -> pd.Series:
+    """
+    pd.to_datetime(values, errors="coerce", **kwargs), parsing each distinct value
+    once; date columns repeat heavily and pandas' own cache often declines to kick in.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce", cache=False, **kwargs)
+    # factorize marks missing values with -1, which take fills with NaT
+    return pd.Series(parsed.array.take(codes, allow_fill=True), index=values.index, name=values.name)
+
+
+def format_dates(dates: pd.Series, fmt: str, na_value=np.nan) -> pd.Series:
+    """
+    dates.dt.strftime(fmt) with missing dates set to `na_value`, formatting
+    each distinct timestamp once; transaction dates repeat heavily.
+    """
+    codes, uniques = pd.factorize(dates)
+    labels = np.append(pd.DatetimeIndex(uniques).strftime(fmt).to_numpy(dtype=object), na_value)
+    # factorize marks NaT with -1, which indexes the trailing na_value
+    return pd.Series(labels[codes], index=dates.index, name=dates.name)
+
+
 def detect_time_column(df: pd.DataFrame):
     for col in df.columns:
         s = df[col]
@@ -12,22 +83,31 @@ def detect_time_column(df: pd.DataFrame):
         if pd.api.types.is_numeric_dtype(s):
             continue
 
-        # Try parsing only object/string columns
+        # Try parsing only object/string columns; dates contain digits, so skip
+        # columns whose leading values mostly don't (cheap check on a sample)
+        sample = s.dropna().head(500).astype(str)
+        if sample.empty or sample.str.contains(r"\d", regex=True).mean() <= 0.5:
+            continue
         try:
-            series = (
-                s.astype(str)
-                .str.replace("\u00A0", " ", regex=False)
-                .str.replace("/", "-", regex=False)
-                .str.strip()
-            )
+            series = s.astype(str).str.translate(_DATE_TRANSLATE).str.strip()
             with warnings.catch_warnings():
                 warnings.filterwarnings("ignore", message="Could not infer format.*")
-                parsed = pd.to_datetime(series, errors="coerce")
+                # ISO 8601 parses without format inference; other layouts use the generic parser
+                parsed = pd.to_datetime(series, errors="coerce", format="ISO8601")
+                if parsed.notna().mean() <= 0.8:
+                    parsed = pd.to_datetime(series, errors="coerce")
             ok_ratio = parsed.notna().mean()
             # require enough valid dates and sensible years
-            if ok_ratio > 0.8:
-                years = parsed.dt.year.dropna()
-                if (years.between(1900, 2100).mean() > 0.95) and (years.nunique() >= 3):
+            if ok_ratio > 0.8 and pd.api.types.is_datetime64_any_dtype(parsed):
+                stamps = parsed.dropna()
+                if getattr(stamps.dt, "tz", None) is not None:
+                    # .dt.year reports local wall-clock years
+                    stamps = stamps.dt.tz_localize(None)
+                years = stamps.to_numpy().astype("datetime64[Y]").astype(np.int64) + 1970
+                in_range = np.count_nonzero((years >= 1900) & (years <= 2100)) / years.size
+                lo, hi = years.min(), years.max()
+                # at least 3 distinct years: some year lies strictly between the extremes
+                if in_range > 0.95 and np.any((years != lo) & (years != hi)):
                     df[col] = parsed
                     return col
         except Exception:
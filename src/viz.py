@@ -1,8 +1,12 @@
-from typing import Dict
+import functools
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from .chart_suggester import ChartSpec
+from .data_cleaner import _detect_datetime_format, _fill_unparsed
+from .utils import parse_dates
 
 MONEY_GREEN = ["#0f9d58", "#1fa776", "#2fc494", "#3fe1b2", "#61f3cd", "#7df6d9"]
 MONEY_GREEN_DARK = ["#4ae3a8", "#35c38e", "#24a072", "#1b7f5b", "#145f44"]
@@ -28,110 +32,316 @@ THEME_STYLES: Dict[str, Dict] = {
     },
 }
 
-def _prepare_line_data(df: pd.DataFrame, spec: ChartSpec):
+
+def _chart_layout(theme: str) -> Dict:
+    """
+    Final layout for a theme's charts. Height is fixed and autosize disabled to
+    avoid repeated auto-margin redraw warnings in Streamlit.
+    """
+    seq = (THEMES.get(theme) or THEMES[DEFAULT_THEME])["color_discrete_sequence"]
+    layout_style = THEME_STYLES.get(theme, {})
+    return go.Layout(
+        height=420,
+        margin=dict(l=20, r=20, t=50, b=20),
+        autosize=False,
+        colorway=seq if seq else None,
+        paper_bgcolor=layout_style.get("paper_bgcolor"),
+        plot_bgcolor=layout_style.get("plot_bgcolor"),
+        font=dict(color=layout_style.get("font_color")),
+        xaxis=dict(gridcolor=layout_style.get("gridcolor")),
+        yaxis=dict(gridcolor=layout_style.get("gridcolor")),
+    ).to_plotly_json()
+
+
+# validated once per theme, so render_chart can apply them as plain dicts
+_CHART_LAYOUTS: Dict[str, Dict] = {theme: _chart_layout(theme) for theme in THEMES}
+
+
+def _time_values(df: pd.DataFrame, group_col: str) -> pd.Series:
+    """
+    The line-chart time column as datetimes; parsed only when not already typed.
+    Each distinct value is parsed once. Text in a layout the cleaner knows (e.g. its own
+    dd.mm.yyyy output) uses that explicit format, leaving only non-matching values to
+    pandas' inference.
+    """
+    time_values = df[group_col]
+    if pd.api.types.is_datetime64_any_dtype(time_values):
+        return time_values
+    fmt = None
+    if time_values.dtype == object and pd.api.types.infer_dtype(time_values, skipna=True) == "string":
+        fmt = _detect_datetime_format(time_values)
+    if fmt is None:
+        return parse_dates(time_values)
+    return _fill_unparsed(parse_dates(time_values, format=fmt), time_values)
+
+
+def _sum_by_time(
+    time_values: pd.Series, metric: Optional[pd.Series], group_col: str, value_col: str
+) -> Optional[pd.DataFrame]:
+    """
+    Per-timestamp sums of a float metric (row counts when `metric` is None), sorted by time,
+    skipping rows where either value is missing: one hash factorize plus np.bincount instead
+    of a GroupBy. Returns None when the dtypes need the general groupby path.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(time_values):
+        return None
+    if metric is None:
+        codes, stamps = pd.factorize(time_values, sort=True)
+        # factorize codes missing timestamps as -1
+        values = np.bincount(codes[codes >= 0], minlength=len(stamps))
+    else:
+        if metric.dtype != np.float64:
+            # integer sums must stay exact; bincount accumulates in float64
+            return None
+        keep = time_values.notna().to_numpy() & metric.notna().to_numpy()
+        codes, stamps = pd.factorize(time_values[keep], sort=True)
+        values = np.bincount(codes, weights=metric.to_numpy()[keep], minlength=len(stamps))
+        # bincount returns int64 for empty input even with weights
+        values = values.astype(np.float64, copy=False)
+    return pd.DataFrame({group_col: stamps, value_col: values})
+
+
+def _prepare_line_data(df: pd.DataFrame, spec: ChartSpec, time_values: Optional[pd.Series] = None):
     """
     Aggregate time series before plotting:
       - prefer the date column; fall back to spec.x if date is missing
-      - coerce dates for proper sorting
+      - coerce dates for proper sorting (pass `time_values` to reuse a parse)
       - sum the metric
     """
-    df_local = df.copy()
-    group_col = "date" if "date" in df_local.columns else spec.x
-    if group_col not in df_local.columns:
+    group_col = "date" if "date" in df.columns else spec.x
+    if group_col not in df.columns:
         raise KeyError(f"Line chart requires time column '{group_col}' to exist.")
 
-    df_local[group_col] = pd.to_datetime(df_local[group_col], errors="coerce")
+    # Work on the two columns the chart needs
+    if time_values is None:
+        time_values = _time_values(df, group_col)
     if spec.y == "__row_count__":
-        agg = (
-            df_local.dropna(subset=[group_col])
-            .groupby(group_col, dropna=False)
-            .size()
-            .reset_index(name="value")
-            .sort_values(group_col, ascending=True)
-        )
         value_col = "value"
+        agg = _sum_by_time(time_values, None, group_col, value_col)
+        if agg is None:
+            # groupby returns its keys sorted, so the result is already in time order
+            agg = (
+                pd.DataFrame({group_col: time_values})
+                .dropna(subset=[group_col])
+                .groupby(group_col, dropna=False)
+                .size()
+                .reset_index(name="value")
+            )
     else:
-        df_local[spec.y] = pd.to_numeric(df_local[spec.y], errors="coerce")
-        agg = (
-            df_local.dropna(subset=[group_col, spec.y])
-            .groupby(group_col, dropna=False)[spec.y]
-            .sum(min_count=1)
-            .reset_index()
-            .sort_values(group_col, ascending=True)
-        )
         value_col = spec.y
+        metric = df[spec.y]
+        if not pd.api.types.is_numeric_dtype(metric):
+            metric = pd.to_numeric(metric, errors="coerce")
+        agg = _sum_by_time(time_values, metric, group_col, value_col)
+        if agg is None:
+            agg = (
+                pd.DataFrame({group_col: time_values, spec.y: metric})
+                .dropna(subset=[group_col, spec.y])
+                .groupby(group_col, dropna=False)[spec.y]
+                .sum(min_count=1)
+                .reset_index()
+            )
     return agg, group_col, value_col
 
-def render_chart(df: pd.DataFrame, spec: ChartSpec, theme: str = "Default"):
+def _safe_cat(series: pd.Series) -> pd.Series:
+    """Category labels as str, with missing values labelled "Missing"."""
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=False) == "string":
+        # already all str and nothing missing: astype(str) would only copy
+        return series
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # "Missing" is usually not a category, so fill on the plain labels
+        series = series.astype(object)
+    return series.fillna("Missing").astype(str)
+
+
+def _prepare_category_data(df: pd.DataFrame, dim: str, y: str):
+    """
+    Aggregate a metric per category label (bar/pie/waterfall):
+      - missing labels become "Missing" so they keep their own slice
+      - sum the metric, or count rows for the __row_count__ pseudo column
+    Labels are factorized once and summed with np.bincount; non-float metrics
+    take the groupby.
+    """
+    labels = _safe_cat(df[dim])
+    if y == "__row_count__":
+        codes, uniques = pd.factorize(labels, sort=True)
+        agg = pd.DataFrame({dim: uniques, "value": np.bincount(codes, minlength=len(uniques))})
+        return agg, dim, "value"
+    metric = df[y]
+    if metric.dtype == np.float64:
+        codes, uniques = pd.factorize(labels, sort=True)
+        values = metric.to_numpy()
+        present = ~np.isnan(values)
+        sums = np.bincount(codes[present], weights=values[present], minlength=len(uniques))
+        sums = sums.astype(np.float64, copy=False)
+        # sum(min_count=1): a label whose values are all missing sums to NaN, not 0
+        sums[np.bincount(codes[present], minlength=len(uniques)) == 0] = np.nan
+        return pd.DataFrame({dim: uniques, y: sums}), dim, y
+    # integer sums stay exact (and keep their dtype) through the groupby
+    df_local = pd.DataFrame({dim: labels, y: metric})
+    agg = df_local.groupby(dim)[y].sum(min_count=1).reset_index()
+    return agg, dim, y
+
+
+def chart_data_key(df: pd.DataFrame, spec: ChartSpec) -> Optional[Tuple[str, str, str]]:
+    """
+    Identify the aggregate a spec is drawn from. Specs that share a key (e.g. bar, pie
+    and waterfall over the same category/metric) can share one groupby.
+    Returns None for kinds plotted from raw rows.
+    """
+    if spec.kind == "line":
+        group_col = "date" if "date" in df.columns else spec.x
+        return ("line", group_col, spec.y)
+    if spec.kind == "bar":
+        return ("category", spec.x, spec.y)
+    if spec.kind in {"pie", "waterfall"}:
+        return ("category", spec.category, spec.y)
+    return None
+
+
+def aggregate_chart_data(
+    df: pd.DataFrame, spec: ChartSpec, time_values: Optional[pd.Series] = None
+) -> Optional[pd.DataFrame]:
+    key = chart_data_key(df, spec)
+    if key is None:
+        return None
+    family, group_col, _ = key
+    if family == "line":
+        return _prepare_line_data(df, spec, time_values)[0]
+    return _prepare_category_data(df, group_col, spec.y)[0]
+
+
+def aggregate_specs(df: pd.DataFrame, specs: Iterable[ChartSpec]) -> Dict[Tuple[str, str, str], pd.DataFrame]:
+    """
+    Pre-aggregate once per distinct chart_data_key so N charts don't pay N groupbys.
+    Line charts over the same time column share one date parse.
+    """
+    aggregates: Dict[Tuple[str, str, str], pd.DataFrame] = {}
+    parsed_times: Dict[str, pd.Series] = {}
+    for spec in specs:
+        key = chart_data_key(df, spec)
+        if key is None or key in aggregates:
+            continue
+        family, group_col, _ = key
+        time_values = None
+        if family == "line" and group_col in df.columns:
+            if group_col not in parsed_times:
+                parsed_times[group_col] = _time_values(df, group_col)
+            time_values = parsed_times[group_col]
+        aggregates[key] = aggregate_chart_data(df, spec, time_values)
+    return aggregates
+
+
+@functools.lru_cache(maxsize=None)
+def _template_json(template: str) -> Dict:
+    """A named plotly template resolved to its plain-dict (validated) form."""
+    return go.Layout(template=template).to_plotly_json()["template"]
+
+
+def _single_trace_figure(trace: Dict, x: str, y: str, template: str) -> go.Figure:
+    """
+    The figure px.line / px.bar build for one uncoloured trace, without the
+    plotly express dispatch: same hover text, axis titles and legend settings.
+
+    Everything is passed in the canonical form plotly's validators would produce,
+    so the figure is built with _validate=False. Later updates must use that
+    form as well (`title={"text": ...}`, not the `title=...` shorthand).
+    """
+    trace = {
+        **trace,
+        "hovertemplate": f"{x}=%{{x}}<br>{y}=%{{y}}<extra></extra>",
+        "legendgroup": "",
+        "name": "",
+        "orientation": "v",
+        "showlegend": False,
+        "xaxis": "x",
+        "yaxis": "y",
+    }
+    layout = {
+        "template": _template_json(template),
+        "xaxis": {"anchor": "y", "domain": [0.0, 1.0], "title": {"text": x}},
+        "yaxis": {"anchor": "x", "domain": [0.0, 1.0], "title": {"text": y}},
+        "legend": {"tracegroupgap": 0},
+        "margin": {"t": 60},
+    }
+    return go.Figure({"data": [trace], "layout": layout}, _validate=False)
+
+
+def render_chart(
+    df: pd.DataFrame,
+    spec: ChartSpec,
+    theme: str = "Default",
+    data: Optional[pd.DataFrame] = None,
+):
+    """
+    Build the Plotly figure for a spec. Pass `data` (from aggregate_chart_data or
+    aggregate_specs) to skip the internal aggregation.
+    """
     theme_cfg = THEMES.get(theme) or THEMES[DEFAULT_THEME]
     tpl = theme_cfg["template"]
     seq = theme_cfg["color_discrete_sequence"]
 
-    def _safe_cat(series):
-        return series.fillna("Missing").astype(str)
-
-    # Avoid pd.NA issues in grouping/color
-    df_local = df.copy()
-    if spec.kind != "line" and spec.x and spec.x in df_local.columns:
-        df_local[spec.x] = _safe_cat(df_local[spec.x])
-    if spec.category and spec.category in df_local.columns:
-        df_local[spec.category] = _safe_cat(df_local[spec.category])
+    key = chart_data_key(df, spec)
+    if key is not None and data is None:
+        data = aggregate_chart_data(df, spec)
+    value_col = "value" if spec.y == "__row_count__" else spec.y
 
+    # go traces get plain numpy arrays: Series serialize through a much slower path
     if spec.kind == "line":
-        agg, group_col, value_col = _prepare_line_data(df_local, spec)
-        fig = px.line(agg, x=group_col, y=value_col, template=tpl, color_discrete_sequence=seq)
+        group_col = key[1]
+        fig = _single_trace_figure(
+            {
+                "type": "scatter",
+                "x": data[group_col].to_numpy(),
+                "y": data[value_col].to_numpy(),
+                "mode": "lines",
+                "line": {"color": seq[0], "dash": "solid"} if seq else {"dash": "solid"},
+                "marker": {"symbol": "circle"},
+            },
+            group_col,
+            value_col,
+            tpl,
+        )
         # Normalize title when we force date grouping
         if group_col == "date":
             title = "Count over date" if spec.y == "__row_count__" else f"{value_col} over date"
-            fig.update_layout(title=title)
+            fig.update_layout(title={"text": title})
+    elif spec.kind == "bar" and spec.x and len(data) >= 20:
+        # too many categories to colour each one: a single trace
+        fig = _single_trace_figure(
+            {
+                "type": "bar",
+                "x": data[spec.x].to_numpy(),
+                "y": data[value_col].to_numpy(),
+                "marker": {"color": seq[0], "pattern": {"shape": ""}} if seq else {"pattern": {"shape": ""}},
+                "alignmentgroup": "True",
+                "offsetgroup": "",
+                "textposition": "auto",
+            },
+            spec.x,
+            value_col,
+            tpl,
+        )
+        fig.update_layout(barmode="relative")
     elif spec.kind == "bar":
-        if spec.y == "__row_count__":
-            grouped = (
-                df_local.dropna(subset=[spec.x])
-                .groupby(spec.x)
-                .size()
-                .reset_index(name="value")
-            )
-            fig = px.bar(
-                grouped,
-                x=spec.x,
-                y="value",
-                template=tpl,
-                color=spec.x if spec.x and grouped[spec.x].nunique() < 20 else None,
-                color_discrete_sequence=seq,
-            )
-        else:
-            fig = px.bar(
-                df_local,
-                x=spec.x,
-                y=spec.y,
-                template=tpl,
-                color=spec.x if spec.x and df_local[spec.x].nunique() < 20 else None,
-                color_discrete_sequence=seq,
-            )
+        fig = px.bar(
+            data,
+            x=spec.x,
+            y=value_col,
+            template=tpl,
+            # one row per category after aggregation, so the row count is the distinct count
+            color=spec.x if spec.x and len(data) < 20 else None,
+            color_discrete_sequence=seq,
+        )
     elif spec.kind == "pie":
-        if spec.category and spec.category in df_local.columns:
-            df_local[spec.category] = _safe_cat(df_local[spec.category])
-        if spec.y == "__row_count__":
-            agg = (
-                df_local.dropna(subset=[spec.category])
-                .groupby(spec.category, dropna=False)
-                .size()
-                .reset_index(name="value")
-            )
-            value_col = "value"
-        else:
-            agg = df_local.groupby(spec.category)[spec.y].sum(min_count=1).reset_index()
-            value_col = spec.y
-        fig = px.pie(agg, names=spec.category, values=value_col, template=tpl, color_discrete_sequence=seq)
+        fig = px.pie(data, names=spec.category, values=value_col, template=tpl, color_discrete_sequence=seq)
     elif spec.kind == "waterfall":
-        agg = df_local.groupby(spec.category)[spec.y].sum().reset_index()
         fig = go.Figure(
             go.Waterfall(
                 name="Contribution",
                 orientation="v",
-                x=agg[spec.category],
-                y=agg[spec.y],
+                x=data[spec.category].to_numpy(),
+                y=data[value_col].fillna(0.0).to_numpy(),
                 decreasing={"marker": {"color": "#EF553B"}},
                 increasing={"marker": {"color": "#00CC96"}},
                 totals={"marker": {"color": "#636EFA"}},
@@ -141,30 +351,8 @@ def render_chart(df: pd.DataFrame, spec: ChartSpec, theme: str = "Default"):
     else:
         fig = px.scatter(df, x=spec.x, y=spec.y, template=tpl, color_discrete_sequence=seq)
 
-    # Apply single-trace color fallback so money green is visible even without categories
-    if seq:
-        if spec.kind in {"line"}:
-            for tr in fig.data:
-                if getattr(tr, "line", None) and not tr.line.color:
-                    tr.line.color = seq[0]
-        elif spec.kind in {"bar", "scatter"}:
-            for tr in fig.data:
-                if getattr(tr, "marker", None) and not tr.marker.color:
-                    tr.marker.color = seq[0]
-
+    layout = _CHART_LAYOUTS.get(theme) or _chart_layout(theme)
     if spec.title:
-        fig.update_layout(title=spec.title)
-    # Fix height and disable autosize to avoid repeated auto-margin redraw warnings in Streamlit
-    layout_style = THEME_STYLES.get(theme, {})
-    fig.update_layout(
-        height=420,
-        margin=dict(l=20, r=20, t=50, b=20),
-        autosize=False,
-        colorway=seq if seq else None,
-        paper_bgcolor=layout_style.get("paper_bgcolor"),
-        plot_bgcolor=layout_style.get("plot_bgcolor"),
-        font=dict(color=layout_style.get("font_color")),
-        xaxis=dict(gridcolor=layout_style.get("gridcolor")),
-        yaxis=dict(gridcolor=layout_style.get("gridcolor")),
-    )
+        layout = {**layout, "title": {"text": spec.title}}
+    fig.update_layout(layout)
     return fig
@@ -1,6 +1,6 @@
 import pandas as pd
 
-from src.data_cleaner import cleaner
+from src.data_cleaner import DataCleaner, cleaner
 
 
 def test_data_cleaner_normalizes_and_coerces_types():
@@ -51,3 +51,72 @@ def test_finance_rows_only_dropped_when_date_and_amounts_missing():
     # drop rows where both date and all amount-like fields are missing
     assert pd.isna(cleaned["note"].iloc[0])
     assert cleaned["note"].iloc[1] == "has amount"
+
+
+def test_monetary_parsing_resolves_thousands_and_decimal_separators():
+    raw = pd.Series(["€1.234,56", "1,234.56", "1,234", "1.234", "3,5", "ca 12 EUR", "n/a", None], dtype=object)
+
+    parsed = cleaner._normalize_monetary_series(raw)
+
+    assert parsed.iloc[:6].tolist() == [1234.56, 1234.56, 1234.0, 1234.0, 3.5, 12.0]
+    assert parsed.iloc[6:].isna().all()
+
+
+def test_dedup_subset_limits_duplicate_check_to_key_columns():
+    raw = pd.DataFrame(
+        {
+            "Amount": [10, 10, 10],
+            "Description": ["rent", "rent", "rent"],
+            "Note": ["a", "b", "a"],
+        }
+    )
+
+    assert len(cleaner.clean(raw)) == 2
+    assert len(DataCleaner(dedup_subset=("amount", "description", "iban")).clean(raw)) == 1
+
+
+def test_clean_leaves_input_frame_untouched():
+    raw = pd.DataFrame(
+        {
+            "Date": ["01.02.2024", "2024-02-03", None],
+            "Net Amount": ["1,5", "€2", "n/a"],
+            "Status": [" Aktiv", "no", None],
+            "Qty": [1, 2, 3],
+        }
+    )
+    snapshot = raw.copy(deep=True)
+
+    cleaner.clean(raw)
+
+    pd.testing.assert_frame_equal(raw, snapshot)
+
+
+def test_trailing_empty_rows_do_not_dilute_numeric_detection():
+    raw = pd.DataFrame(
+        {
+            "Qty": ["1", "2", "3", "", None],
+            "Name": ["a", "b", "c", " ", None],
+        }
+    )
+
+    cleaned = cleaner.clean(raw)
+
+    assert len(cleaned) == 3
+    assert pd.api.types.is_numeric_dtype(cleaned["qty"])
+
+
+def test_hr_fields_keep_missing_values_as_na():
+    raw = pd.DataFrame(
+        {
+            "Name": ["a", "b"],
+            "Status": ["aktiv", None],
+            "Contract_Type": [None, "Full time"],
+        }
+    )
+
+    cleaned = cleaner.clean(raw)
+
+    assert cleaned["status"].iloc[0] == "active"
+    assert pd.isna(cleaned["status"].iloc[1])
+    assert pd.isna(cleaned["contract_type"].iloc[0])
+    assert cleaned["contract_type"].iloc[1] == "full_time"
@@ -1,5 +1,11 @@
 import pandas as pd
 
+from src.bookkeeping import (
+    categorize_transactions,
+    compute_bookkeeping_summaries,
+    detect_recurring,
+    standardize_columns,
+)
 from src.pipeline import process_uploaded_file
 
 
@@ -21,6 +27,27 @@ def test_bookkeeping_mode_computes_expected_cards():
     assert cards["profit"] == 50.0
 
 
+def test_bookkeeping_steps_leave_input_frame_untouched():
+    df = pd.DataFrame(
+        {
+            "date": ["2024-01-01", "2024-01-02", "2024-02-03"],
+            "description": ["Stripe payout", "Rewe", "Gehalt"],
+            "amount": ["100", "-40", "-10"],
+            "iban": ["DE1", "DE2", "DE3"],
+        }
+    )
+    before = df.copy()
+
+    standardized = standardize_columns(df)
+    categorized = categorize_transactions(standardized)
+    recurring = detect_recurring(categorized)
+    compute_bookkeeping_summaries(recurring)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert "bk_category" not in standardized.columns
+    assert standardized["date"].dtype.kind == "M"
+
+
 def test_auto_mode_stays_generic_for_product_sales_table():
     df = pd.DataFrame(
         {
@@ -1,4 +1,7 @@
+import io
+import json
 import pandas as pd
+import plotly.graph_objects as go
 import pytest
 from src.chart_suggester import (
     ChartSpec,
@@ -11,7 +14,7 @@ from src.chart_suggester import (
     suggest_charts,
 )
 from src.report import build_pdf_report
-from src.viz import render_chart
+from src.viz import aggregate_chart_data, aggregate_specs, chart_data_key, render_chart
 
 def test_suggest_and_render():
     df = pd.DataFrame({
@@ -41,6 +44,10 @@ def test_pdf_report():
         raise
     assert isinstance(pdf, (bytes, bytearray)) and len(pdf) > 1000
 
+    out = io.BytesIO()
+    assert build_pdf_report(df, [spec], "Test Report", "Auto Viz Agent", theme="Default", output=out) is None
+    assert out.getvalue().startswith(b"%PDF")
+
 
 def test_axis_filters_and_generation():
     df = pd.DataFrame(
@@ -108,6 +115,21 @@ def test_pie_chart_added_for_categorical():
     assert "pie" in kinds, "Pie chart should be generated for categorical data"
 
 
+def test_unique_counts_look_past_the_first_rows():
+    # constant for the first rows, varied only near the end
+    n = 1500
+    df = pd.DataFrame(
+        {
+            "category": ["a"] * (n - 30) + [f"c{i}" for i in range(30)],
+            "type": ["x"] * n,
+            "value": range(n),
+        }
+    )
+    assert filter_x_candidates(df, ["category", "type"]) == ["category"]
+    charts = generate_all_charts(df)
+    assert not any(c.kind == "pie" and c.category == "category" for c in charts)
+
+
 def test_waterfall_for_finance_categorical():
     df = pd.DataFrame(
         {
@@ -118,3 +140,83 @@ def test_waterfall_for_finance_categorical():
     charts = generate_all_charts(df)
     kinds = [c.kind for c in charts]
     assert "waterfall" in kinds, "Waterfall chart should be included for finance categorical data"
+
+
+def test_aggregate_specs_shares_category_groupby():
+    df = pd.DataFrame(
+        {
+            "category": ["a", "b", "a", None],
+            "amount": [100, -50, 30, -10],
+        }
+    )
+    specs = [
+        ChartSpec(kind="bar", x="category", y="amount"),
+        ChartSpec(kind="pie", category="category", y="amount"),
+        ChartSpec(kind="waterfall", category="category", y="amount"),
+    ]
+    aggregates = aggregate_specs(df, specs)
+    assert len(aggregates) == 1
+
+    agg = aggregates[chart_data_key(df, specs[0])]
+    assert dict(zip(agg["category"], agg["amount"])) == {"a": 130, "b": -50, "Missing": -10}
+    for spec in specs:
+        assert render_chart(df, spec, data=agg) is not None
+
+
+def test_category_aggregate_keeps_all_missing_labels_as_nan():
+    df = pd.DataFrame(
+        {
+            "category": ["b", "a", "b", "c", None],
+            "amount": [1.5, 2.0, None, None, 4.0],
+        }
+    )
+    agg = aggregate_chart_data(df, ChartSpec(kind="bar", x="category", y="amount"))
+    assert agg["category"].tolist() == ["Missing", "a", "b", "c"]
+    assert agg["amount"].tolist()[:3] == [4.0, 2.0, 1.5]
+    assert pd.isna(agg["amount"].iloc[3])
+
+    counts = aggregate_chart_data(df, ChartSpec(kind="pie", category="category", y="__row_count__"))
+    assert counts["value"].tolist() == [1, 1, 2, 1]
+
+
+def test_unvalidated_figures_survive_validation_unchanged():
+    df = pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=30),
+            "customer": [f"c{i}" for i in range(30)],
+            "amount": [float(i) for i in range(30)],
+        }
+    )
+    specs = [
+        ChartSpec(kind="line", x="date", y="amount"),
+        ChartSpec(kind="line", x="date", y="__row_count__", title="Rows"),
+        ChartSpec(kind="bar", x="customer", y="amount"),
+    ]
+    for theme in ("Default", "Dark"):
+        for spec in specs:
+            fig = render_chart(df, spec, theme=theme)
+            validated = go.Figure(fig.to_plotly_json())
+            assert json.loads(validated.to_json()) == json.loads(fig.to_json())
+
+
+def test_line_aggregate_sums_per_timestamp_and_skips_missing():
+    df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-02", None, "2024-01-03"]),
+            "amount": [1.5, 2.0, 3.0, 10.0, None],
+        }
+    )
+    agg = aggregate_chart_data(df, ChartSpec(kind="line", x="date", y="amount"))
+    assert agg["date"].tolist() == list(pd.to_datetime(["2024-01-01", "2024-01-02"]))
+    assert agg["amount"].tolist() == [2.0, 4.5]
+
+    counts = aggregate_chart_data(df, ChartSpec(kind="line", x="date", y="__row_count__"))
+    assert counts["value"].tolist() == [1, 2, 1]
+
+
+def test_line_aggregate_reads_cleaner_day_first_dates():
+    # the cleaner emits dd.mm.yyyy; a leading ambiguous day must not flip the layout to month-first
+    df = pd.DataFrame({"date": ["01.06.2021", "13.05.2021", "01.06.2021"], "amount": [1.0, 2.0, 3.0]})
+    agg = aggregate_chart_data(df, ChartSpec(kind="line", x="date", y="amount"))
+    assert agg["date"].tolist() == list(pd.to_datetime(["2021-05-13", "2021-06-01"]))
+    assert agg["amount"].tolist() == [2.0, 4.0]
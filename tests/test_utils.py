@@ -0,0 +1,51 @@
+import pandas as pd
+
+from src.utils import df_fingerprint, format_dates, month_labels, parse_dates, shrink_int_dtypes
+
+
+def test_df_fingerprint_tracks_content_not_identity():
+    df = pd.DataFrame({"date": ["2024-01-01", "2024-01-02", "2024-01-03"], "amount": [1.0, 2.0, 3.0]})
+
+    assert df_fingerprint(df) == df_fingerprint(df.copy())
+
+    changed = df.copy()
+    changed.loc[2, "amount"] = 4.0
+    assert df_fingerprint(changed) != df_fingerprint(df)
+    assert df_fingerprint(df.rename(columns={"amount": "total"})) != df_fingerprint(df)
+    assert df_fingerprint(df.astype({"amount": "float32"})) != df_fingerprint(df)
+
+
+def test_df_fingerprint_handles_empty_frame():
+    assert df_fingerprint(pd.DataFrame()) == df_fingerprint(pd.DataFrame())
+
+
+def test_shrink_int_dtypes_only_narrows_ints_that_fit():
+    df = pd.DataFrame({"qty": [1, 2, 3], "big": [0, 1, 2**40], "amount": [1.5, 2.0, 3.25], "name": ["a", "b", "c"]})
+
+    out = shrink_int_dtypes(df)
+
+    assert out["qty"].dtype == "int32"
+    assert out["big"].dtype == "int64"
+    assert out["amount"].dtype == "float64"
+    assert out["name"].dtype == object
+    assert df["qty"].dtype == "int64"
+
+
+def test_month_labels_match_period_strings():
+    dates = pd.Series(pd.to_datetime(["2024-01-05", None, "1999-12-31", "2024-01-20"]), index=[3, 1, 4, 9])
+
+    assert month_labels(dates).equals(dates.dt.to_period("M").astype(str))
+
+
+def test_format_dates_matches_strftime_and_fills_missing():
+    dates = pd.Series(pd.to_datetime(["2024-01-05", None, "2024-01-05", "1999-12-31"]))
+
+    assert format_dates(dates, "%d.%m.%Y").equals(dates.dt.strftime("%d.%m.%Y"))
+    assert format_dates(dates, "%m/%d/%y", na_value=None).tolist() == ["01/05/24", None, "01/05/24", "12/31/99"]
+
+
+def test_parse_dates_matches_to_datetime():
+    raw = pd.Series(["2024-01-05", None, "garbage", "2024-01-05", "1999-12-31"], index=[5, 4, 3, 2, 1], name="d")
+
+    assert parse_dates(raw).equals(pd.to_datetime(raw, errors="coerce"))
+    assert parse_dates(raw).name == "d"